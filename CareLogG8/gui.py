@@ -11,22 +11,36 @@ view based on their authentication status and role.
 # carelog/gui.py
 
 import streamlit as st
-from modules.models import PatientNote
+import functools
 import json
 import datetime
-import time
-import pandas as pd
+import operator
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-# Attempt to import streamlit_autorefresh for automatic page refreshing.
-# If unavailable, fall back to a manual refresh mechanism.
-try:
-    from streamlit_autorefresh import st_autorefresh as _st_autorefresh
-except ImportError:
-    _st_autorefresh = getattr(st, "autorefresh", None)
+# Heavy optional dependencies (pandas) and the note model are imported
+# lazily inside the functions that need them: Streamlit re-executes the
+# script top-to-bottom on every interaction, so module-level imports are
+# paid by every session whether or not it uses those views.
 
 # Constants
 CHAT_REFRESH_INTERVAL_SECONDS = 3.0
 
+# datetime.fromisoformat accepts a trailing 'Z' natively from Python 3.11,
+# so the compatibility replace() is only needed on older interpreters.
+_ISO_HAS_Z = sys.version_info >= (3, 11)
+# Detect the local timezone once instead of on every timestamp conversion.
+_LOCAL_TZ = datetime.datetime.now().astimezone().tzinfo
+
+# Height of the scrollable chat history container, in pixels.
+CHAT_HISTORY_HEIGHT_PX = 350
+
+# Shared pool for running independent service fetches concurrently within a
+# single render. Worker callables must not touch st.session_state (no script
+# run context on pool threads); read any state before submitting and merge
+# results back on the main thread.
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="carelog-fetch")
+
 def _rerun():
     """Triggers a rerun of the Streamlit app to refresh the UI.
 
@@ -52,21 +66,85 @@ def _format_timestamp(timestamp_str):
     if not timestamp_str:
         return "Unknown time"
     try:
-        # Ensure the 'Z' is replaced with a UTC offset for consistent parsing.
-        clean_value = timestamp_str.replace('Z', '+00:00')
+        # On older interpreters the 'Z' suffix must be replaced with a UTC
+        # offset for consistent parsing; 3.11+ handles it natively.
+        clean_value = timestamp_str if _ISO_HAS_Z else timestamp_str.replace('Z', '+00:00')
         timestamp = datetime.datetime.fromisoformat(clean_value)
         # If no timezone is present, assume UTC.
         if timestamp.tzinfo is None:
             timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
         # Convert to the user's local timezone.
-        local_timestamp = timestamp.astimezone()
+        local_timestamp = timestamp.astimezone(_LOCAL_TZ)
         return local_timestamp.strftime("%b %d, %Y • %H:%M")
     except ValueError:
         return timestamp_str
 
+def _format_timestamps_bulk(timestamp_strs):
+    """Formats a list of ISO 8601 timestamps in one vectorized pandas pass.
+
+    This avoids per-message Python-level parsing on hot render paths such as
+    the chat history, which reformats every timestamp on each autorefresh.
+    Values pandas cannot parse fall back to `_format_timestamp` so the output
+    matches the scalar helper exactly.
+
+    Args:
+        timestamp_strs (list): ISO-formatted timestamp strings (or None).
+
+    Returns:
+        list: Formatted display strings, one per input value.
+    """
+    if not timestamp_strs:
+        return []
+    import pandas as pd
+
+    parsed = pd.to_datetime(pd.Series(timestamp_strs, dtype="object"), utc=True, errors='coerce')
+    formatted = parsed.dt.tz_convert(_LOCAL_TZ).dt.strftime("%b %d, %Y • %H:%M")
+    return [
+        value if isinstance(value, str) else _format_timestamp(original)
+        for value, original in zip(formatted, timestamp_strs)
+    ]
+
+@functools.lru_cache(maxsize=None)
+def _direct_chat_keys(selected_clinician):
+    """Returns the widget keys for a clinician's direct-message thread.
+
+    The keys are interpolated once per clinician and memoized, rather than
+    rebuilt on every autorefresh rerun of the patient chat page.
+
+    Args:
+        selected_clinician (str): The clinician's username.
+
+    Returns:
+        tuple: (form_key, input_key, clear_button_key) for the thread widgets.
+    """
+    return (
+        f"patient_direct_chat_form_{selected_clinician}",
+        f"patient_direct_message_{selected_clinician}",
+        f"patient_clear_direct_{selected_clinician}",
+    )
+
+# The service used by _display_name_cached. lru_cache keys must be hashable,
+# so the service instance is threaded through this module global instead of a
+# parameter; _get_display_name keeps it pointed at the current service.
+_name_lookup_service = None
+
+@functools.lru_cache(maxsize=4096)
+def _display_name_cached(hospital_id, username, role):
+    """Resolves a user's display name, memoized for the process lifetime.
+
+    Cleared via `cache_clear()` whenever a profile is updated so renamed
+    users don't show stale names.
+    """
+    user_data = _name_lookup_service.get_user_by_username(hospital_id, username, role)
+    return (user_data.get('full_name') if user_data else None) or username
+
 def _get_display_name(service, hospital_id, username, role, cache):
     """Retrieves the full name of a user for display, using a cache to minimize lookups.
 
+    The per-render `cache` dict avoids even the memo lookup inside a single
+    message loop; misses fall through to `_display_name_cached`, which keeps
+    results across pages and sessions.
+
     Args:
         service: The main application service instance.
         hospital_id (str): The ID of the hospital.
@@ -80,13 +158,515 @@ def _get_display_name(service, hospital_id, username, role, cache):
     cache_key = (username, role)
     if cache_key in cache:
         return cache[cache_key]
-    user_data = service.get_user_by_username(hospital_id, username, role)
-    display_name = user_data.get('full_name') if user_data else None
-    if not display_name:
-        display_name = username
+    global _name_lookup_service
+    _name_lookup_service = service
+    display_name = _display_name_cached(hospital_id, username, role)
     cache[cache_key] = display_name
     return display_name
 
+def _get_assigned_clinicians(service, hospital_id, username):
+    """Returns a patient's assigned clinicians, memoized in session state.
+
+    Assignments change on the order of days while the chat page reruns every
+    few seconds, so the lookup is cached and revalidated against the
+    hospital's assignment version counter. The counter is what makes edits
+    from *other* sessions visible: an admin's assign/unassign bumps it, and
+    the next rerun here refetches instead of serving the stale list.
+
+    Args:
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+        username (str): The patient's username.
+
+    Returns:
+        list: The assigned clinician usernames.
+    """
+    version = service.assignments_version(hospital_id)
+    key = f'_assigned_clinicians_{hospital_id}_{username}'
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, service.get_assigned_clinicians_for_patient(hospital_id, username))
+        st.session_state[key] = cached
+    return cached[1]
+
+@st.cache_data(ttl=10)
+def _pain_alert_count(_service, hospital_id):
+    """Returns the number of active pain alerts, cached for a short interval.
+
+    The clinician dashboard banner only needs the count, and alerts change
+    far less often than the menu rerenders, so a 10-second TTL removes almost
+    all of the backend calls. The `_service` argument is underscore-prefixed
+    so Streamlit does not try to hash it.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+
+    Returns:
+        int: The number of active pain alerts.
+    """
+    return len(_service.get_pain_alerts(hospital_id))
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _sorted_pain_alerts(_service, hospital_id):
+    """Returns pain alerts newest-first with display timestamps, briefly cached.
+
+    Sorting and ISO parsing happen once per cache window instead of per
+    alert per rerun; dismissals clear the entry explicitly so the list
+    updates immediately.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+
+    Returns:
+        list: Copies of the alert dictionaries, newest first, each carrying
+        precomputed '_ts_display' and '_dismiss_key' fields.
+    """
+    rows = [(a.get('timestamp') or '', a) for a in _service.get_pain_alerts(hospital_id)]
+    rows.sort(key=operator.itemgetter(0), reverse=True)
+    # Display timestamps and widget keys are stable per alert, so build them
+    # here: once per state change instead of per row per rerun. Copies keep
+    # the render-only fields out of the stored alerts.
+    return [
+        {
+            **alert,
+            '_ts_display': _ISO(ts).strftime('%Y-%m-%d %H:%M') if ts else "Unknown",
+            '_dismiss_key': f"dismiss_{alert.get('alert_id')}",
+        }
+        for ts, alert in rows
+    ]
+
+# The roster and dataset reads below back the most interaction-heavy pages
+# (add note, view notes, admin panel, clinician chat), which rerun on every
+# slider drag, keystroke and autorefresh tick. Each wrapper is keyed on the
+# hospital's data version so a rerun is a cache lookup, and every mutation
+# (notes, users, assignments) bumps the version to refresh the entry. The
+# `_service` argument is underscore-prefixed so Streamlit does not hash it.
+# Because the version only ever grows, old-version entries are dead weight
+# that Streamlit would otherwise keep forever; max_entries bounds each
+# cache (LRU) at roughly its live working set, sized per key cardinality -
+# per-hospital wrappers small, per-patient note lists larger, and the
+# whole-hospital export blobs smallest of all.
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_patients(_service, hospital_id, viewer, version):
+    """Returns the patient roster for a hospital, cached per data version.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        viewer (tuple): The (username, role) of the requesting user; part of
+                        the key because clinicians only see assigned patients.
+        version (int): The hospital's current data version.
+
+    Returns:
+        list: A list of patient user data dictionaries.
+    """
+    # The viewer must reach the service explicitly: the cache is shared
+    # across sessions, and the service's ambient current_user may belong to
+    # another session at compute time.
+    return _service.get_all_patients(hospital_id, viewer)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_clinicians(_service, hospital_id, version):
+    """Returns the approved clinician roster, cached per data version.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        version (int): The hospital's current data version.
+
+    Returns:
+        list: A list of clinician user data dictionaries.
+    """
+    return _service.get_all_clinicians(hospital_id)
+
+# Cap on how many options are handed to st.selectbox at once; every option
+# is rendered client-side, so large rosters make the widget itself slow.
+SELECTBOX_OPTION_LIMIT = 50
+
+# Minimum characters before the note search hits the backend; shorter terms
+# match nearly everything and would re-scan all notes on each keystroke.
+SEARCH_MIN_CHARS = 3
+
+# Hoisted once at import: the note display format and the ISO parser are
+# used in per-note loops, where repeated attribute resolution adds up.
+_TS_FMT = '%Y-%m-%d %H:%M:%S'
+_ISO = datetime.datetime.fromisoformat
+
+# Static page headers built once at import; these pages rerun on every
+# widget interaction, so the f-string-free markup is reused as-is.
+_ASSIGN_HEADER = "<h2 style='text-align: center;'>Assign Clinicians to Patients</h2>"
+_ALERTS_HEADER = "<h2 style='text-align: center;'>Patient Pain Alerts</h2>"
+
+# UI state flags seeded once per session by show_main_app, letting page
+# code index session state directly instead of calling .get per rerun.
+_SESSION_DEFAULTS = {
+    'editing_note_id': None,
+    'editing_user_key': None,
+    'viewing_profile_for_patient': None,
+    'entry_saved_success': False,
+}
+
+def _roster_selectbox(label, usernames, key, format_func=str, noun="patients"):
+    """Renders a user picker that bounds the options fed to st.selectbox.
+
+    Small rosters go straight to the selectbox. Past the limit, a
+    type-to-search input filters server-side (against both the username and
+    its display name) and only the first matches are rendered, keeping the
+    widget cost constant regardless of hospital size.
+
+    Args:
+        label (str): The selectbox label.
+        usernames: The full sequence of usernames to pick from.
+        key (str): The widget key; the filter input derives its key from it.
+        format_func: Maps a username to its display form, as for st.selectbox.
+        noun (str): What the options are, for the filter prompts.
+
+    Returns:
+        str or None: The selected username, or None if nothing matches.
+    """
+    if len(usernames) <= SELECTBOX_OPTION_LIMIT:
+        return st.selectbox(label, usernames, format_func=format_func, key=key)
+
+    search = st.text_input(
+        f"Filter {noun}", key=f"{key}_filter",
+        placeholder=f"Type to search {len(usernames)} {noun}..."
+    )
+    if search:
+        needle = search.casefold()
+        matches = []
+        for username in usernames:
+            if needle in username.casefold() or needle in str(format_func(username)).casefold():
+                matches.append(username)
+                # The selectbox only shows the cap anyway; stop scanning early.
+                if len(matches) >= SELECTBOX_OPTION_LIMIT:
+                    break
+    else:
+        matches = list(usernames[:SELECTBOX_OPTION_LIMIT])
+
+    if not matches:
+        st.caption(f"No {noun} match the filter.")
+        return None
+    return st.selectbox(label, matches, format_func=format_func, key=key)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _patient_usernames(_service, hospital_id, viewer, version):
+    """Returns patient usernames for the selectboxes, cached per data version.
+
+    A tuple rather than a list: immutable, smaller, and identical across
+    reruns so the selectbox sees the same options object every time instead
+    of a freshly built list per keystroke.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        viewer (tuple): The (username, role) of the requesting user.
+        version (int): The hospital's current data version.
+
+    Returns:
+        tuple: The patient usernames visible to the viewer.
+    """
+    return tuple(p['username'] for p in _service.get_all_patients(hospital_id, viewer))
+
+# C-implemented sort key for note timestamps; tolerates missing fields like
+# the old `lambda x: x.get('timestamp', '')` but without the Python-level
+# call per comparison.
+_NOTE_TIMESTAMP_KEY = operator.methodcaller('get', 'timestamp', '')
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _sorted_notes(_service, hospital_id, patient_id, viewer, version):
+    """Returns a patient's notes presorted newest-first, cached per data version.
+
+    Sorting happens once per data change instead of on every expander click
+    or edit keystroke in the view-notes page. The viewer is part of the key
+    because the underlying service call applies per-viewer access rules
+    (clinicians don't see private patient entries, unassigned clinicians see
+    nothing) and `st.cache_data` is shared across sessions.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        patient_id (str): The ID of the patient.
+        viewer (tuple): The viewing user's (username, role) pair.
+        version (int): The hospital's current data version.
+
+    Returns:
+        list: Copies of the patient's note dictionaries, newest first, each
+        carrying a precomputed '_display_timestamp' string.
+    """
+    notes = sorted(_service.get_notes_for_patient(hospital_id, patient_id, viewer), key=_NOTE_TIMESTAMP_KEY, reverse=True)
+    if not notes:
+        return []
+
+    import pandas as pd
+
+    # Parse all timestamps in one vectorized pass so the note cards never
+    # call fromisoformat/strftime per expander per rerun. Copies keep the
+    # display field out of the persisted note records.
+    parsed = pd.to_datetime([n.get('timestamp') or None for n in notes], errors='coerce')
+    decorated = []
+    for note, ts in zip(notes, parsed):
+        note = dict(note)
+        note['_display_timestamp'] = ts.strftime(_TS_FMT) if ts is not pd.NaT else "Unknown Date"
+        decorated.append(note)
+    return decorated
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _searched_notes(_service, hospital_id, patient_id, search_term, viewer, version):
+    """Returns sorted search results for a patient's notes, cached per term.
+
+    Repeated reruns with the same term (expander clicks, autorefresh ticks)
+    reuse the cached result instead of re-scanning the patient's notes, and
+    display timestamps are borrowed from the cached full list by note_id
+    rather than re-parsed.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        patient_id (str): The ID of the patient.
+        search_term (str): The term to match against note text.
+        viewer (tuple): The viewing user's (username, role) pair.
+        version (int): The hospital's current data version.
+
+    Returns:
+        list: Matching note dictionaries, newest first, each carrying a
+        precomputed '_display_timestamp' string.
+    """
+    stamps = {
+        n.get('note_id'): n['_display_timestamp']
+        for n in _sorted_notes(_service, hospital_id, patient_id, viewer, version)
+    }
+    results = sorted(
+        _service.search_notes(hospital_id, patient_id, search_term, viewer),
+        key=_NOTE_TIMESTAMP_KEY, reverse=True
+    )
+    return [
+        {**n, '_display_timestamp': stamps.get(n.get('note_id'), "Unknown Date")}
+        for n in results
+    ]
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _partition_users(_service, hospital_id, version):
+    """Splits a hospital's users into approved and pending, cached per data version.
+
+    One sorted pass replaces the two dict comprehensions plus two sorted()
+    calls the admin page used to run on every rerun; both returned dicts
+    iterate in username order.
+
+    Args:
+        _service: The main application service instance (excluded from hashing).
+        hospital_id (str): The ID of the hospital.
+        version (int): The hospital's current data version.
+
+    Returns:
+        tuple: (approved, pending) dictionaries of user records.
+    """
+    approved, pending = {}, {}
+    for user_key, user_data in sorted(_service.get_all_users(hospital_id).items()):
+        status = user_data.get('status')
+        if status == 'approved':
+            approved[user_key] = user_data
+        elif status == 'pending':
+            pending[user_key] = user_data
+    return approved, pending
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _export_json_bytes(_service, hospital_id, version):
+    """Returns the hospital dataset serialized as JSON bytes for download.
+
+    Cached per data version so preparing or re-clicking the export costs a
+    single serialization per data change.
+    """
+    return json.dumps(_service.get_hospital_dataset(hospital_id), indent=4).encode('utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _export_report_bytes(_service, hospital_id, version):
+    """Builds the human-readable notes report as bytes, cached per data version.
+
+    All timestamps are parsed and formatted in one vectorized pandas pass,
+    and the text is assembled into a single StringIO buffer instead of a
+    per-note list of fragments joined at the end.
+
+    Returns:
+        bytes: The encoded report, or empty bytes when there are no notes.
+    """
+    notes_list = _service.get_hospital_dataset(hospital_id).get('notes', [])
+    if not notes_list:
+        return b""
+
+    import io
+    import pandas as pd
+
+    notes = sorted(notes_list, key=_NOTE_TIMESTAMP_KEY)
+    parsed = pd.to_datetime([n.get('timestamp') or None for n in notes], errors='coerce')
+    stamps = [
+        ts.strftime(_TS_FMT) if ts is not pd.NaT else "Unknown Date"
+        for ts in parsed
+    ]
+
+    buffer = io.StringIO()
+    write = buffer.write
+    write(f"CareLog Notes Report - Generated on {datetime.datetime.now().strftime(_TS_FMT)}\n\n")
+    write("=" * 80 + "\n\n")
+    for note, timestamp in zip(notes, stamps):
+        source = note.get('source', 'clinician')
+        write(f"Timestamp: {timestamp}\n")
+        write(f"Patient ID: {note.get('patient_id', 'N/A')}\n")
+        write(f"Author ID: {note.get('author_id', 'N/A')}\n")
+        write(f"Entry Source: {source.capitalize()}\n")
+        write(f"Mood: {note.get('mood', 'N/A')}/10 | Pain: {note.get('pain', 'N/A')}/10 | Appetite: {note.get('appetite', 'N/A')}/10\n")
+        if source == 'patient':
+            write("\nPatient Wrote:\n" + "-" * 15 + "\n")
+        else:
+            write("\nNarrative Notes:\n" + "-" * 18 + "\n")
+        write((note.get('notes', 'N/A') or "N/A") + "\n")
+        if source == 'clinician':
+            write("\nDiagnoses/Medical Notes:\n" + "-" * 25 + "\n")
+            write((note.get('diagnoses', 'N/A') or "N/A") + "\n")
+        ai_feedback = note.get('ai_feedback')
+        if ai_feedback and ai_feedback.get('status') == 'approved':
+            write("\n\nAI Generated Feedback:\n" + "-" * 22 + "\n")
+            write(ai_feedback.get('text', 'N/A') + "\n")
+        write("\n" + "=" * 80 + "\n\n")
+    return buffer.getvalue().encode('utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _users_csv_bytes(_service, hospital_id, version):
+    """Returns the users export as CSV bytes, cached per data version.
+
+    Builds the sanitized (no credentials) user rows and runs pandas'
+    vectorized CSV writer once per data change instead of on every
+    admin-page rerun.
+
+    Returns:
+        bytes: The encoded CSV, or empty bytes when there are no users.
+    """
+    users_dict_export = _service.get_hospital_dataset(hospital_id).get('users', {})
+    if not users_dict_export:
+        return b""
+
+    import pandas as pd
+
+    export_users_data = []
+    for user_key, u_data in users_dict_export.items():
+        export_users_data.append({
+            'username': u_data.get('username'),
+            'role': u_data.get('role'),
+            'status': u_data.get('status'),
+            'full_name': u_data.get('full_name'),
+            'dob': u_data.get('dob'),
+            'sex': u_data.get('sex'),
+            'pronouns': u_data.get('pronouns'),
+            'bio': u_data.get('bio'),
+            'assigned_clinicians': ', '.join(u_data.get('assigned_clinicians', [])) if u_data.get('role') == 'patient' else ''
+        })
+    users_df = pd.DataFrame(export_users_data)
+    return users_df.to_csv(index=False, lineterminator="\n").encode('utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _notes_csv_bytes(_service, hospital_id, version):
+    """Returns the notes export as CSV bytes, cached per data version.
+
+    Constructing the DataFrame with an explicit column list backfills any
+    missing columns in one C-level call, replacing the per-column existence
+    loop the export section used to run.
+
+    Returns:
+        bytes: The encoded CSV, or empty bytes when there are no notes.
+    """
+    notes_list = _service.get_hospital_dataset(hospital_id).get('notes', [])
+    if not notes_list:
+        return b""
+
+    import pandas as pd
+
+    desired_columns = ['timestamp', 'patient_id', 'author_id', 'source', 'mood', 'pain', 'appetite', 'notes', 'diagnoses']
+    notes_df = pd.DataFrame(notes_list, columns=desired_columns)
+    return notes_df.to_csv(index=False, lineterminator="\n").encode('utf-8')
+
+def _get_cached_messages(cache_key, fetch_since, chat_version, trunc_epoch):
+    """Accumulates a chat thread in session state, fetching only new messages.
+
+    Instead of re-pulling the full conversation history on every autorefresh
+    rerun, the rendered message list is kept in `st.session_state` and each
+    rerun requests only messages at or after the last-seen timestamp.
+
+    Args:
+        cache_key (str): The session-state key holding the accumulated list.
+        fetch_since: A callable taking a `since` timestamp (or None) and
+                     returning the matching messages from the chat service.
+        chat_version (int): The hospital's current chat version counter.
+        trunc_epoch (int): The hospital's current truncation counter.
+
+    Returns:
+        list: The up-to-date, accumulated list of message dictionaries.
+    """
+    cached, future = _start_messages_fetch(cache_key, fetch_since, chat_version, trunc_epoch)
+    return _finish_messages_fetch(cached, future)
+
+def _start_messages_fetch(cache_key, fetch_since, chat_version, trunc_epoch):
+    """Kicks off a delta fetch for a chat thread on the shared executor.
+
+    The session-state cursor is read on the calling thread, so only the pure
+    service call runs on the pool. Pages that render several independent
+    threads per rerun start all fetches first and then collect the results,
+    overlapping the service calls instead of serializing them.
+
+    When the hospital's chat version counter has not moved since the last
+    fetch for this thread, no fetch is started at all: the common idle
+    polling tick costs an integer comparison instead of a backend read.
+
+    Args:
+        cache_key (str): The session-state key holding the accumulated list.
+        fetch_since: A callable taking a `since` timestamp (or None) and
+                     returning the matching messages from the chat service.
+        chat_version (int): The hospital's current chat version counter.
+        trunc_epoch (int): The hospital's current truncation counter.
+
+    Returns:
+        tuple: The accumulated message list and the in-flight fetch future,
+        or None in place of the future when the fetch was skipped.
+    """
+    ss = st.session_state
+    cached = ss.setdefault(cache_key, [])
+    trunc_key = f"{cache_key}_trunc"
+    if ss.get(trunc_key) != trunc_epoch:
+        # Messages were removed somewhere in the hospital (clear or
+        # deleted-user scrub). The delta fetch can only ever append, so the
+        # accumulated list might still hold removed messages - drop it and
+        # refetch the full thread.
+        ss[trunc_key] = trunc_epoch
+        cached.clear()
+    version_key = f"{cache_key}_ver"
+    if cached and ss.get(version_key) == chat_version:
+        return cached, None
+    ss[version_key] = chat_version
+    last_ts = cached[-1].get('timestamp', '') if cached else None
+    return cached, _FETCH_EXECUTOR.submit(fetch_since, last_ts)
+
+def _finish_messages_fetch(cached, future):
+    """Waits for a started fetch and merges the new messages into the cache.
+
+    Args:
+        cached (list): The accumulated list returned by `_start_messages_fetch`.
+        future: The fetch future returned by `_start_messages_fetch`, or None
+                when the fetch was skipped because nothing changed.
+
+    Returns:
+        list: The up-to-date, accumulated list of message dictionaries.
+    """
+    if future is None:
+        return cached
+    # The since boundary is inclusive (second resolution), so drop any
+    # messages we have already accumulated.
+    seen_ids = {m.get('message_id') for m in cached}
+    cached.extend(
+        m for m in future.result() if m.get('message_id') not in seen_ids
+    )
+    return cached
+
 def _render_chat_messages(service, hospital_id, messages):
     """Displays a list of chat messages in a scrollable container.
 
@@ -99,37 +679,49 @@ def _render_chat_messages(service, hospital_id, messages):
         st.info("No messages yet. Start the conversation below.")
         return
 
-    name_cache = {}
-    chat_container = st.container()
-    with chat_container:
-        # Custom CSS to create a scrollable chat history.
-        st.markdown(
-            """
-            <style>
-            div[data-testid="chat-history-wrapper"] {
-                max-height: 350px;
-                overflow-y: auto;
-                padding-right: 12px;
-            }
-            div[data-testid="chat-history-wrapper"]::-webkit-scrollbar {
-                width: 8px;
-            }
-            div[data-testid="chat-history-wrapper"]::-webkit-scrollbar-thumb {
-                background-color: rgba(155, 155, 155, 0.4);
-                border-radius: 4px;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+    # Bind the session-state proxy once for the several accesses below; this
+    # runs on every autorefresh tick, so the proxy dispatch cost adds up.
+    ss = st.session_state
+
+    # The display-name cache lives in session state so resolved names survive
+    # the 3-second autorefresh reruns instead of being re-fetched each time.
+    name_cache = ss.setdefault(f'_name_cache_{hospital_id}', {})
+    # Bulk-prefetch display names for any senders not already cached so the
+    # per-message loop below never has to issue individual backend lookups.
+    pairs = {(m.get('sender'), m.get('sender_role', 'patient')) for m in messages}
+    missing_pairs = pairs - name_cache.keys()
+    if missing_pairs:
+        prefetched = service.get_users_by_usernames(hospital_id, missing_pairs)
+        for pair in missing_pairs:
+            user_data = prefetched.get(pair)
+            name_cache[pair] = (user_data.get('full_name') if user_data else None) or pair[0]
+    # Skip the formatting work entirely when the thread content is unchanged
+    # since the last rerun (the common case on a 3s autorefresh). The widgets
+    # themselves must still be re-emitted every run or Streamlit drops them.
+    signature = hash(tuple(
+        (m.get('message_id'), m.get('timestamp'), m.get('text')) for m in messages
+    ))
+    render_cache = ss.setdefault('_chat_render_cache', {})
+    formatted_timestamps = render_cache.get(signature)
+    if formatted_timestamps is None:
+        # Format every timestamp up front in one vectorized pass instead of
+        # parsing each one individually inside the render loop.
+        formatted_timestamps = _format_timestamps_bulk([m.get('timestamp') for m in messages])
+        # Old signatures accumulate as conversations grow; keep the cache small.
+        if len(render_cache) > 16:
+            render_cache.clear()
+        render_cache[signature] = formatted_timestamps
+
+    # A fixed-height container gives a genuinely scrollable history; the old
+    # hand-rolled wrapper <div> markdown never actually enclosed the message
+    # widgets, so its CSS had no effect.
+    with st.container(height=CHAT_HISTORY_HEIGHT_PX):
         # Render each message in a chat bubble.
-        chat_wrapper = st.markdown('<div data-testid="chat-history-wrapper">', unsafe_allow_html=True)
-        for message in messages:
+        for message, timestamp_display in zip(messages, formatted_timestamps):
             sender = message.get('sender')
             role = message.get('sender_role', 'patient')
             display_name = _get_display_name(service, hospital_id, sender, role, name_cache)
             role_label = "Patient" if role == 'patient' else 'Clinician'
-            timestamp_display = _format_timestamp(message.get('timestamp'))
             bubble_role = "user" if role == 'patient' else 'assistant'
             avatar = "🙂" if role == 'patient' else "🩺"
 
@@ -137,7 +729,6 @@ def _render_chat_messages(service, hospital_id, messages):
                 st.markdown(f"**{display_name}** · {role_label}")
                 st.write(message.get('text', ''))
                 st.caption(timestamp_display)
-        st.markdown('</div>', unsafe_allow_html=True)
 
 # Page navigation helpers
 def set_page_welcome():
@@ -186,7 +777,6 @@ def show_login_form(service):
                     st.error("Hospital ID, Username, and Password are required.")
                 else:
                     with st.spinner("Logging in..."):
-                        time.sleep(1) # Simulate network latency
                         user = service.login(username, password, role, hospital_id)
                         if user == 'pending':
                             st.warning("Your account creation is successful but is pending approval by an administrator.")
@@ -233,7 +823,6 @@ def show_register_form(service):
                     st.error("All fields are required.")
                 else:
                     with st.spinner("Registering..."):
-                        time.sleep(1) # Simulate processing time
                         result = service.register_user(username, password, role, hospital_id, full_name, dob.isoformat(), sex, pronouns, bio)
                         if result == 'weak_password':
                             st.error("Password must be at least 8 characters and include uppercase, lowercase, number, and symbol.")
@@ -257,17 +846,26 @@ def show_main_app(service):
     Args:
         service: The main application service instance.
     """
-    user = st.session_state.current_user
-    hospital_id = st.session_state.hospital_id
+    # Bind the session-state proxy once; every attribute access on it goes
+    # through __getattr__ plus a lock, and this function touches it on every
+    # rerun and every autorefresh tick.
+    ss = st.session_state
+    user = ss.current_user
+    hospital_id = ss.hospital_id
+
+    # Seed UI state flags once per session; the pages below can then index
+    # session state directly instead of re-testing membership every rerun.
+    for key, default in _SESSION_DEFAULTS.items():
+        ss.setdefault(key, default)
 
     # Initialize the page state if it doesn't exist.
-    if 'page' not in st.session_state:
-        st.session_state.page = None
+    if 'page' not in ss:
+        ss.page = None
 
     # Reset page state if the user's role changes or on the first load.
-    if 'current_role' not in st.session_state or st.session_state.current_role != user.role:
-        st.session_state.page = None
-        st.session_state.current_role = user.role
+    if 'current_role' not in ss or ss.current_role != user.role:
+        ss.page = None
+        ss.current_role = user.role
 
     menu_placeholder = st.empty()
 
@@ -303,126 +901,55 @@ def show_main_app(service):
                 """,
                 unsafe_allow_html=True
             )
-            # Create a button for each menu option.
-            for idx, (label, value, description) in enumerate(options):
-                button_key = f"{user.role}_menu_btn_{idx}"
+            # Create a button for each menu option. The key list is built once
+            # per session and reused across reruns.
+            keys_cache_key = f"_menu_btn_keys_{user.role}"
+            button_keys = ss.get(keys_cache_key)
+            if button_keys is None or len(button_keys) != len(options):
+                button_keys = [f"{user.role}_menu_btn_{idx}" for idx in range(len(options))]
+                ss[keys_cache_key] = button_keys
+            for (label, value, description), button_key in zip(options, button_keys):
                 if st.button(label, key=button_key, use_container_width=True):
-                    st.session_state.page = value
+                    ss.page = value
                     st.rerun()
                 st.caption(description)
                 st.divider()
             # Logout button.
             if st.button("Log Out", key=f"{user.role}_logout_btn", use_container_width=True):
                 with st.spinner("Logging out..."):
-                    time.sleep(1)
                     service.logout()
-                    st.session_state.current_user = None
-                    st.session_state.hospital_id = None
-                    st.session_state.auth_page = 'welcome'
+                    ss.current_user = None
+                    ss.hospital_id = None
+                    ss.auth_page = 'welcome'
                     st.rerun()
 
     def _show_back_button():
         """Renders a button to navigate back to the main menu."""
         if st.button("← Back to Main Menu"):
-            st.session_state.page = None
+            ss.page = None
             st.rerun()
 
-    # Role-based routing for the main application.
-    if user.role == 'clinician':
-        menu_items = [
-            ("View Notes", "clinician_view_notes", "Browse patients' histories, search within notes, and review profiles."),
-            ("Add Note", "clinician_add_note", "Log a new clinical observation for any assigned patient."),
-            ("Messaging", "clinician_messaging", "Chat with patients in real time or leave care-team updates."),
-            ("AI Feedback", "clinician_feedback", "Review and finalize AI-generated responses before sending."),
-            ("Pain Alerts", "clinician_alerts", "Respond to any critical 10/10 pain alerts reported by patients."),
-            ("My Profile", "clinician_profile", "Update your personal and professional details."),
-        ]
-        if st.session_state.page is None:
-            alerts = service.get_pain_alerts(hospital_id)
-            banner = f"🚨 {len(alerts)} high-priority alerts awaiting review." if alerts else None
-            _show_main_menu(menu_items, "Clinician Dashboard", banner_message=banner)
-            return
-        else:
-            menu_placeholder.empty()
-
-        # Sub-page routing for the clinician dashboard.
-        if st.session_state.page == "clinician_view_notes":
-            _show_back_button()
-            _render_view_notes_page(service, hospital_id)
-        elif st.session_state.page == "clinician_add_note":
-            _show_back_button()
-            _render_add_note_page(service, hospital_id)
-        elif st.session_state.page == "clinician_messaging":
-            _show_back_button()
-            _render_clinician_chat_page(service, hospital_id)
-        elif st.session_state.page == "clinician_feedback":
-            _show_back_button()
-            _render_review_feedback_page(service, hospital_id)
-        elif st.session_state.page == "clinician_alerts":
-            _show_back_button()
-            _render_pain_alerts_page(service, hospital_id)
-        elif st.session_state.page == "clinician_profile":
-            _show_back_button()
-            _render_profile_page(service, hospital_id)
-        else:
-            st.session_state.page = None
-            st.rerun()
+    # Role-based routing for the main application. The menus and sub-page
+    # handlers live in the module-level _ROLE_CONFIG table, so routing here
+    # is a couple of dict lookups instead of a chain of role/page branches.
+    config = _ROLE_CONFIG.get(user.role)
+    if config is None:
+        st.error(f"Unknown role: {user.role}")
+        return
 
-    elif user.role == 'patient':
-        menu_items = [
-            ("Add Entry", "patient_add_entry", "Log how you feel today, including mood, pain, and appetite."),
-            ("View Notes", "patient_view_notes", "See your full care history and any clinician notes."),
-            ("Messaging", "patient_messaging", "Reach your care team or chat privately with assigned clinicians."),
-            ("My Profile", "patient_profile", "Edit your personal information and preferences."),
-        ]
-        if st.session_state.page is None:
-            _show_main_menu(menu_items, "Patient Hub")
-            return
-        else:
-            menu_placeholder.empty()
-
-        # Sub-page routing for the patient hub.
-        if st.session_state.page == "patient_add_entry":
-            _show_back_button()
-            _render_add_patient_entry_page(service, hospital_id)
-        elif st.session_state.page == "patient_view_notes":
-            _show_back_button()
-            _render_view_notes_page(service, hospital_id, patient_id=user.username)
-        elif st.session_state.page == "patient_messaging":
-            _show_back_button()
-            _render_patient_chat_page(service, hospital_id)
-        elif st.session_state.page == "patient_profile":
-            _show_back_button()
-            _render_profile_page(service, hospital_id)
-        else:
-            st.session_state.page = None
-            st.rerun()
+    if ss.page is None:
+        banner_fn = config.get('banner_fn')
+        banner = banner_fn(service, hospital_id) if banner_fn else None
+        _show_main_menu(config['menu'], config['title'], banner_message=banner)
+        return
 
-    elif user.role == 'admin':
-        menu_items = [
-            ("User Management", "admin_users", "Approve new users, edit accounts, and export hospital data."),
-            ("Assign Clinicians", "admin_assign", "Pair clinicians with patients to streamline communication."),
-            ("My Profile", "admin_profile", "Maintain your administrator account details."),
-        ]
-        if st.session_state.page is None:
-            _show_main_menu(menu_items, "Admin Console")
-            return
-        else:
-            menu_placeholder.empty()
-
-        # Sub-page routing for the admin console.
-        if st.session_state.page == "admin_users":
-            _show_back_button()
-            _render_admin_page(service, hospital_id)
-        elif st.session_state.page == "admin_assign":
-            _show_back_button()
-            _render_assign_clinicians_page(service, hospital_id)
-        elif st.session_state.page == "admin_profile":
-            _show_back_button()
-            _render_profile_page(service, hospital_id)
-        else:
-            st.session_state.page = None
-            st.rerun()
+    menu_placeholder.empty()
+    handler = config['handlers'].get(ss.page)
+    if handler is None:
+        ss.page = None
+        st.rerun()
+    _show_back_button()
+    handler(service, hospital_id)
 
 def _render_profile_page(service, hospital_id):
     """Renders the user profile page for viewing and editing personal details.
@@ -433,7 +960,8 @@ def _render_profile_page(service, hospital_id):
     """
     st.markdown("<h2 style='text-align: center;'>My Profile</h2>", unsafe_allow_html=True)
     user = st.session_state.current_user
-    user_data = service.get_all_users(hospital_id).get(f"{user.username}_{user.role}")
+    # Fetch just this user's record instead of loading the whole hospital roster.
+    user_data = service.get_user_by_username(hospital_id, user.username, user.role)
 
     if not user_data:
         st.error("Could not load user profile.")
@@ -466,8 +994,10 @@ def _render_profile_page(service, hospital_id):
                 "pronouns": pronouns, "bio": bio, "new_password": new_password
             }
             with st.spinner("Updating profile..."):
-                time.sleep(1)
                 if service.update_user_profile(hospital_id, user.username, user.role, update_details):
+                    # Drop memoized display names so the new name shows everywhere.
+                    _display_name_cached.cache_clear()
+                    st.session_state.pop(f'_name_cache_{hospital_id}', None)
                     st.success("Profile updated successfully!")
                 else:
                     st.error("Failed to update profile.")
@@ -509,30 +1039,6 @@ def _display_user_profile_details(user_data):
     st.write(f"**Bio:**")
     st.info(user_data.get('bio') or "_No bio provided._")
 
-def _schedule_auto_refresh(key, interval_seconds=CHAT_REFRESH_INTERVAL_SECONDS, expected_page=None):
-    """Schedules a periodic rerun of the app to keep chat feeds fresh.
-
-    Args:
-        key (str): A unique key for the autorefresh component.
-        interval_seconds (float): The refresh interval in seconds.
-        expected_page (str, optional): If provided, the refresh will only occur
-                                       if the session is on this page.
-    """
-    interval_ms = int(interval_seconds * 1000)
-    if _st_autorefresh:
-        _st_autorefresh(interval=interval_ms, key=key)
-        st.caption(f"Chat updates automatically every {int(interval_seconds)} seconds.")
-        return
-
-    # Fallback mechanism if st_autorefresh is not available.
-    st.caption(f"Chat updates automatically every {int(interval_seconds)} seconds.")
-    if expected_page is not None and st.session_state.get('page') != expected_page:
-        return
-    time.sleep(interval_seconds)
-    if expected_page is not None and st.session_state.get('page') != expected_page:
-        return
-    _rerun()
-
 def _render_patient_chat_page(service, hospital_id):
     """Renders the patient's secure messaging interface.
 
@@ -546,18 +1052,51 @@ def _render_patient_chat_page(service, hospital_id):
         st.error("Chat service is currently unavailable.")
         return
 
-    user = st.session_state.current_user
     st.info("Use the care team channel to reach any approved clinician. Direct messages go straight to a specific clinician assigned to you.")
+    _patient_chat_channels(service, hospital_id)
 
-    care_tab, direct_tab = st.tabs(["Care Team Channel", "Direct Messages"])
+@st.fragment(run_every=CHAT_REFRESH_INTERVAL_SECONDS)
+def _patient_chat_channels(service, hospital_id):
+    """Renders the patient's chat channels as a self-refreshing fragment.
 
-    # Care Team Channel tab
-    with care_tab:
+    The polling loop lives on the fragment (`run_every`), mirroring
+    `_clinician_chat_threads`: each tick reruns only this subtree inside the
+    live session, so `st.session_state` - including the login - survives
+    every refresh.
+
+    Args:
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+    """
+    chat_service = service.chat
+    ss = st.session_state
+    user = ss.current_user
+
+    # A radio selector instead of st.tabs: tab bodies all execute on every
+    # rerun even when hidden, so the invisible channel still hit the backend.
+    # With the radio gate only the selected channel does any work.
+    channel = st.radio(
+        "Channel",
+        ["Care Team Channel", "Direct Messages"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="patient_chat_channel"
+    )
+
+    # Care Team Channel
+    if channel == "Care Team Channel":
         st.subheader("Care Team Channel")
-        messages = chat_service.get_general_messages(hospital_id, user.username)
+        general_cache_key = f"_chat_msgs_general_{hospital_id}_{user.username}"
+        messages = _get_cached_messages(
+            general_cache_key,
+            lambda since: chat_service.get_general_messages(hospital_id, user.username, since=since),
+            service.chat_version(hospital_id),
+            chat_service.truncation_epoch(hospital_id)
+        )
         clear_general = st.button("Clear Care Team Messages", key="patient_clear_general")
         if clear_general:
             chat_service.clear_general_messages(hospital_id, user.username)
+            ss.pop(general_cache_key, None)
             st.success("Care team messages cleared.")
             _rerun()
         _render_chat_messages(service, hospital_id, messages)
@@ -574,29 +1113,47 @@ def _render_patient_chat_page(service, hospital_id):
         if send_general:
             text = (general_message or "").strip()
             if text:
-                chat_service.add_general_message(
+                entry = chat_service.add_general_message(
                     hospital_id,
                     user.username,
                     user.username,
                     user.role,
                     text
                 )
-                _rerun()
+                # Optimistically append the stored entry to the session cache:
+                # the rerun then renders it straight from the cache and its
+                # delta fetch returns nothing new, so sending costs a local
+                # append rather than a history refetch.
+                if entry:
+                    ss[general_cache_key].append(entry)
+                    _rerun()
 
-    # Direct Messages tab
-    with direct_tab:
+    # Direct Messages
+    else:
         st.subheader("Direct Messages With Assigned Clinicians")
-        assigned_clinicians = service.get_assigned_clinicians_for_patient(hospital_id, user.username)
+        assigned_clinicians = _get_assigned_clinicians(service, hospital_id, user.username)
 
         if not assigned_clinicians:
             st.info("You don't have any clinicians assigned yet. Once assigned, you can chat with them here.")
         else:
-            # Create a map of usernames to full names for the selectbox.
-            clinician_map = {}
-            for clinician_username in assigned_clinicians:
-                clinician_data = service.get_user_by_username(hospital_id, clinician_username, 'clinician')
-                full_name = clinician_data.get('full_name') if clinician_data else None
-                clinician_map[clinician_username] = full_name or clinician_username
+            # Create a map of usernames to full names for the selectbox. The
+            # built dict is cached in session state and rebuilt only when the
+            # hospital's assignment version counter moves.
+            assignments_version = service.assignments_version(hospital_id)
+            map_cache_key = f'_clinician_map_{hospital_id}'
+            cached_map = ss.get(map_cache_key)
+            if cached_map and cached_map[0] == assignments_version:
+                clinician_map = cached_map[1]
+            else:
+                # Resolve all assigned clinicians in one batched lookup.
+                clinician_records = service.get_users_by_usernames(
+                    hospital_id, [(username, 'clinician') for username in assigned_clinicians]
+                )
+                clinician_map = {
+                    username: (clinician_records.get((username, 'clinician'), {}).get('full_name') or username)
+                    for username in assigned_clinicians
+                }
+                ss[map_cache_key] = (assignments_version, clinician_map)
 
             selected_clinician = st.selectbox(
                 "Select a clinician",
@@ -606,18 +1163,26 @@ def _render_patient_chat_page(service, hospital_id):
             )
 
             if selected_clinician:
-                messages = chat_service.get_direct_messages(hospital_id, user.username, selected_clinician)
-                clear_direct = st.button("Clear Direct Messages", key=f"patient_clear_direct_{selected_clinician}")
+                form_key, input_key, clear_key = _direct_chat_keys(selected_clinician)
+                direct_cache_key = f"_chat_msgs_direct_{hospital_id}_{user.username}_{selected_clinician}"
+                messages = _get_cached_messages(
+                    direct_cache_key,
+                    lambda since: chat_service.get_direct_messages(
+                        hospital_id, user.username, selected_clinician, since=since
+                    ),
+                    service.chat_version(hospital_id),
+                    chat_service.truncation_epoch(hospital_id)
+                )
+                clear_direct = st.button("Clear Direct Messages", key=clear_key)
                 if clear_direct:
                     chat_service.clear_direct_messages(hospital_id, user.username, selected_clinician)
+                    ss.pop(direct_cache_key, None)
                     st.success("Direct conversation cleared.")
                     _rerun()
                 _render_chat_messages(service, hospital_id, messages)
 
                 # Form for sending a new direct message.
                 prompt_name = clinician_map.get(selected_clinician, selected_clinician)
-                form_key = f"patient_direct_chat_form_{selected_clinician}"
-                input_key = f"patient_direct_message_{selected_clinician}"
                 with st.form(form_key, clear_on_submit=True):
                     direct_message = st.text_input(
                         f"Message {prompt_name}",
@@ -629,7 +1194,7 @@ def _render_patient_chat_page(service, hospital_id):
                 if send_direct:
                     text = (direct_message or "").strip()
                     if text:
-                        chat_service.add_direct_message(
+                        entry = chat_service.add_direct_message(
                             hospital_id,
                             user.username,
                             selected_clinician,
@@ -637,9 +1202,12 @@ def _render_patient_chat_page(service, hospital_id):
                             user.role,
                             text
                         )
-                        _rerun()
+                        # Optimistic append; see the care-team send path.
+                        if entry:
+                            ss[direct_cache_key].append(entry)
+                            _rerun()
 
-    _schedule_auto_refresh(f"patient_chat_refresh_{user.username}", expected_page="patient_messaging")
+    st.caption(f"Chat updates automatically every {int(CHAT_REFRESH_INTERVAL_SECONDS)} seconds.")
 
 def _render_clinician_chat_page(service, hospital_id):
     """Renders the clinician's secure messaging interface.
@@ -655,7 +1223,9 @@ def _render_clinician_chat_page(service, hospital_id):
         return
 
     user = st.session_state.current_user
-    patients = service.get_all_patients(hospital_id)
+    patients = _cached_patients(
+        service, hospital_id, (user.username, user.role), service.data_version(hospital_id)
+    )
     if not patients:
         st.info("No patients assigned to you yet.")
         return
@@ -668,24 +1238,69 @@ def _render_clinician_chat_page(service, hospital_id):
         patient_map[username] = full_name or username
 
     patient_usernames = list(patient_map.keys())
-    selected_patient = st.selectbox(
+    selected_patient = _roster_selectbox(
         "Select a patient",
         patient_usernames,
-        format_func=lambda username: patient_map.get(username, username),
-        key="clinician_chat_patient"
+        key="clinician_chat_patient",
+        format_func=lambda username: patient_map.get(username, username)
     )
+    if not selected_patient:
+        return
 
     st.info("Respond in the care team channel to keep everyone informed, or send a direct note the patient sees immediately.")
 
+    _clinician_chat_threads(service, hospital_id, selected_patient, patient_map)
+
+@st.fragment(run_every=CHAT_REFRESH_INTERVAL_SECONDS)
+def _clinician_chat_threads(service, hospital_id, selected_patient, patient_map):
+    """Renders both chat tabs for a patient as a self-refreshing fragment.
+
+    The polling loop lives on the fragment (`run_every`), so each tick reruns
+    only this subtree — the two message fetches and their rendering — instead
+    of the whole script with its roster read and selectbox rebuild. Changing
+    the selected patient still triggers a full rerun from the selectbox.
+
+    Args:
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+        selected_patient (str): The username of the patient being messaged.
+        patient_map (dict): A mapping of patient usernames to display names.
+    """
+    chat_service = service.chat
+    user = st.session_state.current_user
+
+    # Both tab bodies render every rerun, so start their independent message
+    # fetches together on the shared executor and collect the results inside
+    # each tab — the two service calls overlap instead of running back to back.
+    chat_version = service.chat_version(hospital_id)
+    trunc_epoch = chat_service.truncation_epoch(hospital_id)
+    general_cache_key = f"_chat_msgs_general_{hospital_id}_{selected_patient}"
+    general_cached, general_future = _start_messages_fetch(
+        general_cache_key,
+        lambda since: chat_service.get_general_messages(hospital_id, selected_patient, since=since),
+        chat_version,
+        trunc_epoch
+    )
+    direct_cache_key = f"_chat_msgs_direct_{hospital_id}_{selected_patient}_{user.username}"
+    direct_cached, direct_future = _start_messages_fetch(
+        direct_cache_key,
+        lambda since: chat_service.get_direct_messages(
+            hospital_id, selected_patient, user.username, since=since
+        ),
+        chat_version,
+        trunc_epoch
+    )
+
     care_tab, direct_tab = st.tabs(["Care Team Channel", "Direct Message"])
 
     # Care Team Channel tab
     with care_tab:
         st.subheader("Care Team Channel")
-        messages = chat_service.get_general_messages(hospital_id, selected_patient)
+        messages = _finish_messages_fetch(general_cached, general_future)
         clear_general = st.button("Clear Care Team Messages", key=f"clinician_clear_general_{selected_patient}")
         if clear_general:
             chat_service.clear_general_messages(hospital_id, selected_patient)
+            st.session_state.pop(general_cache_key, None)
             st.success("Care team messages cleared.")
             _rerun()
         _render_chat_messages(service, hospital_id, messages)
@@ -705,22 +1320,27 @@ def _render_clinician_chat_page(service, hospital_id):
         if send_general:
             text = (general_message or "").strip()
             if text:
-                chat_service.add_general_message(
+                entry = chat_service.add_general_message(
                     hospital_id,
                     selected_patient,
                     user.username,
                     user.role,
                     text
                 )
-                _rerun()
+                # Optimistically append to the session cache so the rerun
+                # renders the new message without refetching the history.
+                if entry:
+                    general_cached.append(entry)
+                    _rerun()
 
     # Direct Message tab
     with direct_tab:
         st.subheader("Direct Message With Patient")
-        messages = chat_service.get_direct_messages(hospital_id, selected_patient, user.username)
+        messages = _finish_messages_fetch(direct_cached, direct_future)
         clear_direct = st.button("Clear Direct Messages", key=f"clinician_clear_direct_{selected_patient}")
         if clear_direct:
             chat_service.clear_direct_messages(hospital_id, selected_patient, user.username)
+            st.session_state.pop(direct_cache_key, None)
             st.success("Direct conversation cleared.")
             _rerun()
         _render_chat_messages(service, hospital_id, messages)
@@ -749,13 +1369,12 @@ def _render_clinician_chat_page(service, hospital_id):
                     text
                 )
                 if entry:
+                    # Optimistic append; see the care-team send path.
+                    direct_cached.append(entry)
                     _rerun()
                 else:
                     st.warning("You can only send direct messages to patients assigned to you.")
 
-    refresh_key = f"clinician_chat_refresh_{user.username}_{selected_patient}"
-    _schedule_auto_refresh(refresh_key, expected_page="clinician_messaging")
-
 def _render_add_note_page(service, hospital_id):
     """Renders the page for a clinician to add a new note for a patient.
 
@@ -764,11 +1383,13 @@ def _render_add_note_page(service, hospital_id):
         hospital_id (str): The ID of the hospital.
     """
     st.markdown("<h2 style='text-align: center;'>Add a New Patient Note</h2>", unsafe_allow_html=True)
-    patients = service.get_all_patients(hospital_id)
-    if not patients:
+    user = st.session_state.current_user
+    patient_usernames = _patient_usernames(
+        service, hospital_id, (user.username, user.role), service.data_version(hospital_id)
+    )
+    if not patient_usernames:
         st.warning("No patients found for this hospital.")
         return
-    patient_usernames = [p['username'] for p in patients]
 
     with st.form("add_note_form"):
         selected_patient = st.selectbox("Select Patient", patient_usernames)
@@ -782,7 +1403,8 @@ def _render_add_note_page(service, hospital_id):
         submitted = st.form_submit_button("Save Note")
         if submitted:
             with st.spinner("Saving note..."):
-                time.sleep(1)
+                from modules.models import PatientNote
+
                 author_id = st.session_state.current_user.username
                 note = PatientNote(
                     patient_id=selected_patient, author_id=author_id, mood=mood, pain=pain,
@@ -802,9 +1424,9 @@ def _render_add_patient_entry_page(service, hospital_id):
     st.markdown("<h2 style='text-align: center;'>Add a New Entry</h2>", unsafe_allow_html=True)
 
     # Display a persistent success message after saving an entry.
-    if st.session_state.get('entry_saved_success'):
+    if st.session_state.entry_saved_success:
         st.success("Your entry has been saved successfully.")
-        del st.session_state['entry_saved_success'] # Clear the flag to prevent re-showing.
+        st.session_state.entry_saved_success = False # Clear the flag to prevent re-showing.
 
     form = st.form("add_patient_entry_form")
     with form:
@@ -817,7 +1439,8 @@ def _render_add_patient_entry_page(service, hospital_id):
 
     if submitted:
         with st.spinner("Saving entry..."):
-            time.sleep(1)
+            from modules.models import PatientNote
+
             user = st.session_state.current_user
             note = PatientNote(
                 patient_id=user.username, author_id=user.username, mood=mood, pain=pain,
@@ -827,6 +1450,26 @@ def _render_add_patient_entry_page(service, hospital_id):
             st.session_state.entry_saved_success = True
             st.rerun()
 
+def _visible_to(note, role):
+    """Returns True when a note may be shown to a viewer with the given role.
+
+    Encapsulates both visibility rules: private patient entries are only
+    shown to the patient, and clinician notes flagged hidden_from_patient
+    are only shown to staff. Kept as a plain function rather than an
+    lru_cache keyed by note_id, because the privacy flags can change when
+    a note is edited and the check is just two dict lookups.
+
+    Args:
+        note (dict): The note to check.
+        role (str): The viewer's role.
+
+    Returns:
+        bool: Whether the note should be rendered.
+    """
+    if note.get('source', 'clinician') == 'patient':
+        return not (note.get('is_private') and role != 'patient')
+    return not (note.get('hidden_from_patient', False) and role == 'patient')
+
 def _render_view_notes_page(service, hospital_id, patient_id=None):
     """Renders the page for viewing patient notes and entries.
 
@@ -840,28 +1483,34 @@ def _render_view_notes_page(service, hospital_id, patient_id=None):
                                     If None, a selector is shown for clinicians.
     """
     user = st.session_state.current_user
+    viewer = (user.username, user.role)
     # Patient view
     if patient_id:
         st.markdown("<h2 style='text-align: center;'>My Medical Notes & Entries</h2>", unsafe_allow_html=True)
-        notes = service.get_notes_for_patient(hospital_id, patient_id)
+        notes = _sorted_notes(service, hospital_id, patient_id, viewer, service.data_version(hospital_id))
     # Clinician/Admin view
     else:
         st.markdown("<h2 style='text-align: center;'>View All Patient Notes & Entries</h2>", unsafe_allow_html=True)
-        patients = service.get_all_patients(hospital_id)
-        if not patients:
+        patient_usernames = _patient_usernames(
+            service, hospital_id, (user.username, user.role), service.data_version(hospital_id)
+        )
+        if not patient_usernames:
             st.warning("No patients assigned to you or no patients in this hospital.")
             return
-        patient_usernames = [p['username'] for p in patients]
-        selected_patient = st.selectbox("Select a patient to view their notes", patient_usernames)
+        selected_patient = _roster_selectbox(
+            "Select a patient to view their notes", patient_usernames, key="view_notes_patient"
+        )
+        if not selected_patient:
+            return
         
         # Reset the profile view state if the selected patient changes.
-        if st.session_state.get('viewing_profile_for_patient') and st.session_state.viewing_profile_for_patient != selected_patient:
+        if st.session_state.viewing_profile_for_patient and st.session_state.viewing_profile_for_patient != selected_patient:
             st.session_state.viewing_profile_for_patient = None
 
         # Clinicians can view the patient's profile.
         if user.role == 'clinician' and selected_patient:
             # Toggle button for viewing/hiding the patient profile.
-            if st.session_state.get('viewing_profile_for_patient') != selected_patient:
+            if st.session_state.viewing_profile_for_patient != selected_patient:
                 if st.button("View Patient Profile", key="view_patient_profile_btn"):
                     st.session_state.viewing_profile_for_patient = selected_patient
                     st.rerun()
@@ -875,120 +1524,197 @@ def _render_view_notes_page(service, hospital_id, patient_id=None):
             st.divider() # Add a divider for better separation
         # Clinicians can search within a patient's notes.
         if user.role == 'clinician':
-            search_term = st.text_input("Search notes for this patient:")
-            if search_term:
-                notes = service.search_notes(hospital_id, selected_patient, search_term)
+            search_term = st.text_input("Search notes for this patient:").strip()
+            if len(search_term) >= SEARCH_MIN_CHARS:
+                notes = _searched_notes(
+                    service, hospital_id, selected_patient, search_term,
+                    viewer, service.data_version(hospital_id)
+                )
             else:
-                notes = service.get_notes_for_patient(hospital_id, selected_patient)
+                if search_term:
+                    st.caption(f"Type at least {SEARCH_MIN_CHARS} characters to search.")
+                notes = _sorted_notes(service, hospital_id, selected_patient, viewer, service.data_version(hospital_id))
         else:
-            notes = service.get_notes_for_patient(hospital_id, selected_patient)
+            notes = _sorted_notes(service, hospital_id, selected_patient, viewer, service.data_version(hospital_id))
 
 
+    # Drop notes the viewer may not see before any rendering work happens,
+    # so hidden and private entries never reach the expander/fragment path.
+    notes = [note for note in notes if _visible_to(note, user.role)]
+
     if not notes:
         st.info("No notes or entries found for this patient.")
     else:
-        # Display notes sorted by timestamp, newest first.
-        for note in sorted(notes, key=lambda x: x.get('timestamp', ''), reverse=True):
-            source = note.get("source", "clinician")
-            timestamp_str = note.get('timestamp')
-            timestamp = datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M:%S') if timestamp_str else "Unknown Date"
-            author = note.get('author_id', 'Unknown')
-
-            privacy_icon = "🔒" if note.get('is_private') else ""
-            hidden_from_patient = note.get('hidden_from_patient', False)
-
-            # Determine the title and visibility of the note expander.
-            if source == "patient":
-                expander_title = f"Patient Entry from {timestamp} {privacy_icon}"
-                if note.get('is_private') and user.role != 'patient':
-                    st.write("This note is private and cannot be viewed.")
-                    continue
-            else:
-                if hidden_from_patient and user.role == 'patient':
-                    continue
-                hidden_suffix = " [Clinicians Only]" if hidden_from_patient else ""
-                expander_title = f"Clinical Note from {timestamp} (by {author}){hidden_suffix}"
-            
-            with st.expander(expander_title):
-                # Display note details, using .get() to prevent errors if fields are missing.
-                st.metric("Mood", f"{note.get('mood', 'N/A')}/10")
-                st.metric("Pain", f"{note.get('pain', 'N/A')}/10")
-                st.metric("Appetite", f"{note.get('appetite', 'N/A')}/10")
-                st.write("**Patient wrote:**" if source == "patient" else "**Narrative Notes:**")
-                st.write(note.get('notes') or "_No notes provided._")
-                if source == "clinician":
-                    st.write("**Diagnoses/Medical Notes:**")
-                    st.write(note.get('diagnoses') or "_No diagnoses provided._")
-                    if hidden_from_patient:
-                        st.info("This note is hidden from the patient and is only visible to assigned clinicians.")
-                
-                # Display AI feedback if available and approved.
-                ai_feedback = note.get('ai_feedback')
-                if ai_feedback:
-                    if ai_feedback.get('status') == 'approved':
-                        st.divider()
-                        st.markdown("**AI Generated Feedback**")
-                        st.success(ai_feedback.get('text'))
-                    elif ai_feedback.get('status') == 'pending':
-                        st.divider()
-                        st.info("Awaiting AI feedback approval from clinician to ensure your safety.")
-                
-                # Allow patients to request AI feedback on their non-private notes.
-                elif user.role == 'patient' and note.get('source') == 'patient' and not note.get('is_private'):
-                    st.divider()
-                    if st.button("Generate AI Feedback", key=f"gen_ai_{note.get('note_id')}"):
-                        with st.spinner("Generating AI Feedback..."):
-                            success = service.generate_and_store_ai_feedback(note.get('note_id'), hospital_id)
-                        if success:
-                            st.success("AI feedback is being generated. A clinician will review it shortly.")
-                            st.rerun()
-                        else:
-                            st.error("Could not generate feedback for this note.")
+        # Notes arrive presorted newest-first from the cached helpers above
+        # and already filtered for visibility; each note renders as its own
+        # fragment so card-local interactions don't rerun the page.
+        for note in notes:
+            _render_note_card(note, user, service, hospital_id)
 
-                
-                # Determine if the current user can edit or delete the note.
-                can_edit_or_delete = (user.role == 'patient' and note.get('source') == 'patient') or \
-                                     (user.role == 'clinician' and note.get('source') == 'clinician' and note.get('author_id') == user.username)
+@st.fragment
+def _render_note_card(note, user, service, hospital_id):
+    """Renders one note expander as a fragment.
 
-                if can_edit_or_delete:
-                    st.divider()
-                    c1, c2 = st.columns(2)
-                    with c1:
-                        if st.button("Edit Note", key=f"edit_{note.get('note_id', 'unknown_id')}"):
-                            st.session_state.editing_note_id = note.get('note_id')
-                            st.rerun()
-                    with c2:
-                        if st.button("Delete Note", key=f"delete_{note.get('note_id', 'unknown_id')}"):
-                            service.delete_note(note['note_id'], hospital_id)
-                            st.success("Note deleted successfully.")
-                            st.rerun()
+    Toggling the edit form reruns only this card; actions that change the
+    note list itself (delete, save, AI feedback) still trigger a full rerun
+    so the page picks up the new data version.
 
-                # If editing, display the note editing form.
-                if st.session_state.get('editing_note_id') == note.get('note_id'):
-                    with st.form(key=f"edit_form_{note.get('note_id')}"):
-                        st.subheader("Edit Note")
-                        edited_notes = st.text_area("Notes", value=note.get('notes', ''))
-                        edited_diagnoses = st.text_area("Diagnoses", value=note.get('diagnoses', '')) if source == "clinician" else None
-                        share_checkbox = None
-                        if source == "clinician":
-                            share_checkbox = st.checkbox(
-                                "Share with patient",
-                                value=not hidden_from_patient,
-                                help="Uncheck to keep this note visible only to clinicians assigned to the patient."
-                            )
-                        
-                        save_changes = st.form_submit_button("Save Changes")
-                        if save_changes:
-                            updated_data = {'notes': edited_notes}
-                            if edited_diagnoses is not None:
-                                updated_data['diagnoses'] = edited_diagnoses
-                                updated_data['hidden_from_patient'] = not share_checkbox
-                            elif source == "clinician" and share_checkbox is not None:
-                                updated_data['hidden_from_patient'] = not share_checkbox
-                            service.update_note(hospital_id, note.get('note_id'), updated_data)
-                            st.session_state.editing_note_id = None
-                            st.success("Note updated.")
-                            st.rerun()
+    Args:
+        note (dict): The note to render.
+        user: The logged-in user object.
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+    """
+    source = note.get("source", "clinician")
+    # Precomputed by _sorted_notes; no per-card ISO parsing here.
+    timestamp = note.get('_display_timestamp', "Unknown Date")
+    author = note.get('author_id', 'Unknown')
+
+    privacy_icon = "🔒" if note.get('is_private') else ""
+    hidden_from_patient = note.get('hidden_from_patient', False)
+
+    if source == "patient":
+        expander_title = f"Patient Entry from {timestamp} {privacy_icon}"
+    else:
+        hidden_suffix = " [Clinicians Only]" if hidden_from_patient else ""
+        expander_title = f"Clinical Note from {timestamp} (by {author}){hidden_suffix}"
+
+    with st.expander(expander_title):
+        # One markdown call covers the metrics table and the text sections;
+        # a page of notes can hold dozens of cards, so collapsing seven
+        # widgets per card into one keeps the widget count flat.
+        body = [
+            "| Mood | Pain | Appetite |",
+            "|---|---|---|",
+            f"| {note.get('mood', 'N/A')}/10 | {note.get('pain', 'N/A')}/10 | {note.get('appetite', 'N/A')}/10 |",
+            "",
+            "**Patient wrote:**" if source == "patient" else "**Narrative Notes:**",
+            "",
+            note.get('notes') or "_No notes provided._",
+        ]
+        if source == "clinician":
+            body += [
+                "",
+                "**Diagnoses/Medical Notes:**",
+                "",
+                note.get('diagnoses') or "_No diagnoses provided._",
+            ]
+        st.markdown("\n".join(body))
+        if source == "clinician" and hidden_from_patient:
+            st.info("This note is hidden from the patient and is only visible to assigned clinicians.")
+
+        # Display AI feedback if available and approved.
+        ai_feedback = note.get('ai_feedback')
+        if ai_feedback:
+            if ai_feedback.get('status') == 'approved':
+                st.divider()
+                st.markdown("**AI Generated Feedback**")
+                st.success(ai_feedback.get('text'))
+            elif ai_feedback.get('status') == 'pending':
+                st.divider()
+                st.info("Awaiting AI feedback approval from clinician to ensure your safety.")
+
+        # Allow patients to request AI feedback on their non-private notes.
+        elif user.role == 'patient' and note.get('source') == 'patient' and not note.get('is_private'):
+            st.divider()
+            if st.button("Generate AI Feedback", key=f"gen_ai_{note.get('note_id')}"):
+                with st.spinner("Generating AI Feedback..."):
+                    success = service.generate_and_store_ai_feedback(note.get('note_id'), hospital_id)
+                if success:
+                    st.success("AI feedback is being generated. A clinician will review it shortly.")
+                    st.rerun()
+                else:
+                    st.error("Could not generate feedback for this note.")
+
+        # Determine if the current user can edit or delete the note.
+        can_edit_or_delete = (user.role == 'patient' and note.get('source') == 'patient') or \
+                             (user.role == 'clinician' and note.get('source') == 'clinician' and note.get('author_id') == user.username)
+
+        if can_edit_or_delete:
+            st.divider()
+            c1, c2 = st.columns(2)
+            with c1:
+                if st.button("Edit Note", key=f"edit_{note.get('note_id', 'unknown_id')}"):
+                    # Only this card's UI changes, so rerun just the fragment.
+                    st.session_state.editing_note_id = note.get('note_id')
+                    st.rerun(scope="fragment")
+            with c2:
+                if st.button("Delete Note", key=f"delete_{note.get('note_id', 'unknown_id')}"):
+                    service.delete_note(note['note_id'], hospital_id)
+                    st.success("Note deleted successfully.")
+                    st.rerun()
+
+        # Only the card whose id matches builds the edit form; every other
+        # card pays a single comparison here.
+        if st.session_state.editing_note_id == note.get('note_id'):
+            _render_edit_note_form(note, service, hospital_id)
+
+def _render_edit_note_form(note, service, hospital_id):
+    """Renders the edit form for the note currently being edited.
+
+    Built at most once per rerun, for the single note whose id matches
+    `st.session_state.editing_note_id`. Because the caller is a fragment,
+    typing in the form never reruns the rest of the page.
+
+    Args:
+        note (dict): The note being edited.
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+    """
+    source = note.get("source", "clinician")
+    hidden_from_patient = note.get('hidden_from_patient', False)
+    with st.form(key=f"edit_form_{note.get('note_id')}"):
+        st.subheader("Edit Note")
+        edited_notes = st.text_area("Notes", value=note.get('notes', ''))
+        edited_diagnoses = st.text_area("Diagnoses", value=note.get('diagnoses', '')) if source == "clinician" else None
+        share_checkbox = None
+        if source == "clinician":
+            share_checkbox = st.checkbox(
+                "Share with patient",
+                value=not hidden_from_patient,
+                help="Uncheck to keep this note visible only to clinicians assigned to the patient."
+            )
+
+        save_changes = st.form_submit_button("Save Changes")
+        if save_changes:
+            updated_data = {'notes': edited_notes}
+            if edited_diagnoses is not None:
+                updated_data['diagnoses'] = edited_diagnoses
+                updated_data['hidden_from_patient'] = not share_checkbox
+            elif source == "clinician" and share_checkbox is not None:
+                updated_data['hidden_from_patient'] = not share_checkbox
+            service.update_note(hospital_id, note.get('note_id'), updated_data)
+            st.session_state.editing_note_id = None
+            st.success("Note updated.")
+            st.rerun()
+
+@st.fragment
+def _render_user_row(user_key, user_data, service, hospital_id, pending=False):
+    """Renders one admin user row as a collapsed-by-default fragment.
+
+    `st.expander` bodies execute on every rerun even while collapsed, so a
+    large roster made the admin page pay for every profile block each run.
+    A cheap toggle button stands in for the expander header and the heavy
+    management entry renders only while the row is open; toggling reruns
+    just this fragment.
+
+    Args:
+        user_key (str): A unique key identifying the user.
+        user_data (dict): The user's data.
+        service: The main application service instance.
+        hospital_id (str): The ID of the hospital.
+        pending (bool): Whether the user is awaiting approval.
+    """
+    open_key = f"exp_open_{user_key}"
+    is_open = st.session_state.get(open_key, False)
+    suffix = " - ⏳ Pending" if pending else ""
+    label = f"{'▾' if is_open else '▸'} {user_data.get('username')} ({user_data.get('role', '').capitalize()}){suffix}"
+    if st.button(label, key=f"toggle_{user_key}", use_container_width=True):
+        st.session_state[open_key] = not is_open
+        st.rerun(scope="fragment")
+    if is_open:
+        with st.container(border=True):
+            _render_user_management_entry(user_key, user_data, service, hospital_id)
 
 def _render_user_management_entry(user_key, user_data, service, hospital_id):
     """Renders a single user entry in the admin management panel with action buttons.
@@ -1029,7 +1755,7 @@ def _render_user_management_entry(user_key, user_data, service, hospital_id):
             st.error("Failed to delete user.")
 
     # If this user is being edited, show the edit form.
-    if st.session_state.get('editing_user_key') == user_key:
+    if st.session_state.editing_user_key == user_key:
         with st.form(key=f"edit_form_{user_key}"):
             st.subheader(f"Editing {user_data.get('username')}")
             full_name = st.text_input("Full Name", value=user_data.get('full_name', ''))
@@ -1047,6 +1773,9 @@ def _render_user_management_entry(user_key, user_data, service, hospital_id):
                     "pronouns": pronouns, "bio": bio
                 }
                 if service.update_user_profile(hospital_id, user_data.get('username'), user_data.get('role'), update_details):
+                    # Drop memoized display names so the new name shows everywhere.
+                    _display_name_cached.cache_clear()
+                    st.session_state.pop(f'_name_cache_{hospital_id}', None)
                     st.success("Profile updated successfully!")
                     st.session_state.editing_user_key = None
                     st.rerun()
@@ -1062,26 +1791,49 @@ def _render_admin_page(service, hospital_id):
     """
     st.markdown(f"<h2 style='text-align: center;'>Admin Panel for {hospital_id}</h2>", unsafe_allow_html=True)
     st.subheader("User Accounts")
-    users_dict = service.get_all_users(hospital_id)
+    active_users, pending_users = _partition_users(service, hospital_id, service.data_version(hospital_id))
 
-    if not users_dict:
+    if not active_users and not pending_users:
         st.info("No users found for this hospital.")
     else:
-        # Separate users into pending and active for display.
-        active_users = {k: v for k, v in users_dict.items() if v.get('status') == 'approved'}
-        pending_users = {k: v for k, v in users_dict.items() if v.get('status') == 'pending'}
-
         if pending_users:
             st.markdown("##### Awaiting Approval")
-            for user_key, user_data in sorted(pending_users.items()):
-                with st.expander(f"**{user_data.get('username')}** ({user_data.get('role', '').capitalize()}) - ⏳ Pending"):
-                    _render_user_management_entry(user_key, user_data, service, hospital_id)
+            # Bulk actions: one service call and one rerun for the whole
+            # selection, instead of a full page rerun per approve/delete.
+            if len(pending_users) > 1:
+                with st.form("bulk_pending_form"):
+                    selections = {
+                        user_key: st.checkbox(
+                            f"{user_data.get('username')} ({user_data.get('role', '').capitalize()})",
+                            key=f"bulk_pending_{user_key}"
+                        )
+                        for user_key, user_data in pending_users.items()
+                    }
+                    c1, c2 = st.columns(2)
+                    approve_selected = c1.form_submit_button("Approve selected", type="primary")
+                    delete_selected = c2.form_submit_button("Delete selected")
+                if approve_selected or delete_selected:
+                    chosen = [
+                        (pending_users[user_key].get('username'), pending_users[user_key].get('role'))
+                        for user_key, checked in selections.items() if checked
+                    ]
+                    if not chosen:
+                        st.warning("No users selected.")
+                    elif approve_selected:
+                        count = service.approve_users_bulk(chosen, hospital_id)
+                        st.success(f"Approved {count} user(s).")
+                        st.rerun()
+                    else:
+                        count = service.delete_users_bulk(chosen, hospital_id)
+                        st.success(f"Deleted {count} user(s).")
+                        st.rerun()
+            for user_key, user_data in pending_users.items():
+                _render_user_row(user_key, user_data, service, hospital_id, pending=True)
 
         if active_users:
             st.markdown("##### Active Accounts")
-            for user_key, user_data in sorted(active_users.items()):
-                with st.expander(f"**{user_data.get('username')}** ({user_data.get('role', '').capitalize()})"):
-                    _render_user_management_entry(user_key, user_data, service, hospital_id)
+            for user_key, user_data in active_users.items():
+                _render_user_row(user_key, user_data, service, hospital_id)
 
     st.divider() # Add a divider for better separation.
     
@@ -1115,94 +1867,61 @@ def _render_admin_page(service, hospital_id):
 
     st.divider() # Add a divider for better separation.
 
-    # Data export section.
+    # Data export section. Each export is built only after its "Prepare"
+    # button is pressed — serializing the hospital dataset on every admin-page
+    # rerun was pure waste when no download was wanted — and the serialized
+    # bytes are cached per data version so repeated clicks cost nothing.
     st.header("Data Export")
     st.warning(f"The following exports contain data for **{hospital_id} ONLY**.")
-    hospital_data = service.get_hospital_dataset(hospital_id)
 
     # Export as raw JSON.
     st.subheader("1. Export as Raw JSON")
-    json_string = json.dumps(hospital_data, indent=4)
-    st.download_button(
-       "Download Hospital Data (JSON)", json_string,
-       f"carelog_{hospital_id}_export_{datetime.date.today()}.json", "application/json"
-    )
+    if st.button("Prepare JSON export", key="prepare_export_json"):
+        st.session_state.export_ready_json = True
+    if st.session_state.get('export_ready_json'):
+        st.download_button(
+            "Download Hospital Data (JSON)",
+            _export_json_bytes(service, hospital_id, service.data_version(hospital_id)),
+            f"carelog_{hospital_id}_export_{datetime.date.today()}.json", "application/json"
+        )
     st.divider() # Add a divider for better separation.
 
     # Export as CSV files.
     st.subheader("2. Export as CSV")
-    col1, col2 = st.columns(2)
-    with col1:
-        users_dict_export = hospital_data.get('users', {})
-        if users_dict_export:
-            # Prepare user data for export, excluding sensitive fields.
-            export_users_data = []
-            for user_key, u_data in users_dict_export.items():
-                user_export_data = {
-                    'username': u_data.get('username'),
-                    'role': u_data.get('role'),
-                    'status': u_data.get('status'),
-                    'full_name': u_data.get('full_name'),
-                    'dob': u_data.get('dob'),
-                    'sex': u_data.get('sex'),
-                    'pronouns': u_data.get('pronouns'),
-                    'bio': u_data.get('bio'),
-                    'assigned_clinicians': ', '.join(u_data.get('assigned_clinicians', [])) if u_data.get('role') == 'patient' else ''
-                }
-                export_users_data.append(user_export_data)
-            users_df = pd.DataFrame(export_users_data)
-            st.download_button(
-                "Download Users (CSV)", users_df.to_csv(index=False).encode('utf-8'),
-                f"carelog_{hospital_id}_users_{datetime.date.today()}.csv", "text/csv"
-            )
-    with col2:
-        notes_list = hospital_data.get('notes', [])
-        if notes_list:
-            notes_df = pd.DataFrame(notes_list)
-            desired_columns = ['timestamp', 'patient_id', 'author_id', 'source', 'mood', 'pain', 'appetite', 'notes', 'diagnoses']
-            # Ensure all desired columns exist before exporting.
-            for col in desired_columns:
-                if col not in notes_df.columns: notes_df[col] = None
-            st.download_button(
-                "Download Notes (CSV)", notes_df[desired_columns].to_csv(index=False).encode('utf-8'),
-                f"carelog_{hospital_id}_notes_{datetime.date.today()}.csv", "text/csv"
-            )
+    if st.button("Prepare CSV exports", key="prepare_export_csv"):
+        st.session_state.export_ready_csv = True
+    if st.session_state.get('export_ready_csv'):
+        version = service.data_version(hospital_id)
+        users_csv = _users_csv_bytes(service, hospital_id, version)
+        notes_csv = _notes_csv_bytes(service, hospital_id, version)
+        col1, col2 = st.columns(2)
+        with col1:
+            if users_csv:
+                st.download_button(
+                    "Download Users (CSV)", users_csv,
+                    f"carelog_{hospital_id}_users_{datetime.date.today()}.csv", "text/csv"
+                )
+        with col2:
+            if notes_csv:
+                st.download_button(
+                    "Download Notes (CSV)", notes_csv,
+                    f"carelog_{hospital_id}_notes_{datetime.date.today()}.csv", "text/csv"
+                )
     st.divider() # Add a divider for better separation.
 
     # Export as a human-readable text report.
     st.subheader("3. Export as Human-Readable Report")
     st.write("Download all notes as a simple, formatted text file for easy reading or printing.")
-    notes_list = hospital_data.get('notes', [])
-    if not notes_list:
+    if st.button("Prepare report", key="prepare_export_report"):
+        st.session_state.export_ready_report = True
+    if not st.session_state.get('export_ready_report'):
+        return
+    report_bytes = _export_report_bytes(service, hospital_id, service.data_version(hospital_id))
+    if not report_bytes:
         st.info("There are no notes to export in this report.")
     else:
-        report_content = [f"CareLog Notes Report - Generated on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", "="*80 + "\n"]
-        for note in sorted(notes_list, key=lambda x: x.get('timestamp', '')):
-            timestamp_str = note.get('timestamp')
-            timestamp = datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M:%S') if timestamp_str else "Unknown Date"
-            report_content.extend([
-                f"Timestamp: {timestamp}",
-                f"Patient ID: {note.get('patient_id', 'N/A')}",
-                f"Author ID: {note.get('author_id', 'N/A')}",
-                f"Entry Source: {note.get('source', 'clinician').capitalize()}",
-                f"Mood: {note.get('mood', 'N/A')}/10 | Pain: {note.get('pain', 'N/A')}/10 | Appetite: {note.get('appetite', 'N/A')}/10",
-                "\nPatient Wrote:\n" + "-"*15 if note.get('source') == 'patient' else "\nNarrative Notes:\n" + "-"*18,
-                note.get('notes', 'N/A') or "N/A"
-            ])
-            if note.get('source', 'clinician') == 'clinician':
-                report_content.extend(["\nDiagnoses/Medical Notes:\n" + "-"*25, note.get('diagnoses', 'N/A') or "N/A"])
-            
-            ai_feedback = note.get('ai_feedback')
-            if ai_feedback and ai_feedback.get('status') == 'approved':
-                report_content.extend([
-                    "\n\nAI Generated Feedback:\n" + "-"*22,
-                    ai_feedback.get('text', 'N/A')
-                ])
-            report_content.append("\n" + "="*80 + "\n")
-        
-        final_report = "\n".join(report_content)
         st.download_button(
-            label="Download Notes Report (.txt)", data=final_report.encode('utf-8'),
+            label="Download Notes Report (.txt)", data=report_bytes,
             file_name=f"carelog_report_notes_{datetime.date.today()}.txt", mime="text/plain"
         )
 
@@ -1223,7 +1942,7 @@ def _render_review_feedback_page(service, hospital_id):
     for note in pending_feedback:
         patient_id_display = note.get('patient_id', 'Unknown Patient')
         timestamp_str = note.get('timestamp')
-        timestamp_display = datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M:%S') if timestamp_str else "Unknown Date"
+        timestamp_display = _ISO(timestamp_str).strftime(_TS_FMT) if timestamp_str else "Unknown Date"
         notes_display = note.get('notes', '_No notes provided._')
 
         st.subheader(f"Feedback for {patient_id_display}'s note from {timestamp_display}")
@@ -1251,30 +1970,42 @@ def _render_review_feedback_page(service, hospital_id):
                 st.success("Feedback has been rejected and removed.")
                 st.rerun()
 
+@st.fragment
 def _render_assign_clinicians_page(service, hospital_id):
     """Renders the admin page for assigning clinicians to patients.
 
+    Runs as a fragment so selectbox changes and assign/unassign clicks
+    rerun only this page body instead of the whole router and menu.
+
     Args:
         service: The main application service instance.
         hospital_id (str): The ID of the hospital.
     """
-    st.markdown("<h2 style='text-align: center;'>Assign Clinicians to Patients</h2>", unsafe_allow_html=True)
+    st.markdown(_ASSIGN_HEADER, unsafe_allow_html=True)
 
-    patients = service.get_all_patients(hospital_id)
-    clinicians = service.get_all_clinicians(hospital_id)
+    # Rosters come from the version-keyed caches, so selectbox changes and
+    # button clicks rerun without refetching the full user tables; the data
+    # version moves on any assignment or roster change, which invalidates
+    # these entries without explicit .clear() calls.
+    user = st.session_state.current_user
+    version = service.data_version(hospital_id)
+    patients = _cached_patients(service, hospital_id, (user.username, user.role), version)
+    clinicians = _cached_clinicians(service, hospital_id, version)
 
     if not patients or not clinicians:
         st.warning("You need at least one approved patient and one approved clinician to make assignments.")
         return
 
     patient_usernames = [p['username'] for p in patients]
-    selected_patient_username = st.selectbox("Select a Patient", patient_usernames)
+    selected_patient_username = _roster_selectbox(
+        "Select a Patient", patient_usernames, key="assign_patient"
+    )
 
     if selected_patient_username:
-        patient_user_key = f"{selected_patient_username}_patient"
-        all_users = service.get_all_users(hospital_id)
-        patient_data = all_users.get(patient_user_key, {})
-        assigned_clinicians = patient_data.get('assigned_clinicians', [])
+        # Read just this patient's assignment list instead of loading the
+        # whole user table; the session memo revalidates against the
+        # assignment version the handlers below bump.
+        assigned_clinicians = _get_assigned_clinicians(service, hospital_id, selected_patient_username)
 
         st.write(f"**Assigned Clinicians for {selected_patient_username}:**")
         if not assigned_clinicians:
@@ -1287,42 +2018,130 @@ def _render_assign_clinicians_page(service, hospital_id):
                 if col2.button("Unassign", key=f"unassign_{clin}_{selected_patient_username}"):
                     service.unassign_clinician_from_patient(hospital_id, selected_patient_username, clin)
                     st.success(f"Unassigned {clin} from {selected_patient_username}.")
-                    st.rerun()
+                    st.rerun(scope="fragment")
 
         st.divider() # Add a divider for better separation.
         st.subheader("Assign a New Clinician")
         # Show only clinicians who are not already assigned to this patient.
-        available_clinicians = [c['username'] for c in clinicians if c['username'] not in assigned_clinicians]
+        # A frozenset keeps the filter linear instead of rescanning the
+        # assignment list once per clinician.
+        assigned_set = frozenset(assigned_clinicians)
+        available_clinicians = [c['username'] for c in clinicians if c['username'] not in assigned_set]
         if not available_clinicians:
             st.write("All available clinicians are already assigned to this patient.")
         else:
-            selected_clinician = st.selectbox("Select Clinician to Assign", available_clinicians)
-            if st.button("Assign Clinician"):
+            selected_clinician = _roster_selectbox(
+                "Select Clinician to Assign", available_clinicians,
+                key="assign_clinician", noun="clinicians"
+            )
+            if selected_clinician and st.button("Assign Clinician"):
                 service.assign_clinician_to_patient(hospital_id, selected_patient_username, selected_clinician)
                 st.success(f"Assigned {selected_clinician} to {selected_patient_username}.")
-                st.rerun()
+                st.rerun(scope="fragment")
 
+@st.fragment
 def _render_pain_alerts_page(service, hospital_id):
     """Renders the page for clinicians to view and dismiss high-pain alerts.
 
+    Runs as a fragment so dismissing an alert redraws only the alert list,
+    not the whole router and menu.
+
     Args:
         service: The main application service instance.
         hospital_id (str): The ID of the hospital.
     """
-    st.markdown("<h2 style='text-align: center;'>Patient Pain Alerts</h2>", unsafe_allow_html=True)
+    st.markdown(_ALERTS_HEADER, unsafe_allow_html=True)
     st.info("This page lists entries where patients have reported a pain level of 10/10.")
-    alerts = service.get_pain_alerts(hospital_id)
+    alerts = _sorted_pain_alerts(service, hospital_id)
 
     if not alerts:
         st.success("No active pain alerts. Great!")
         return
 
-    # Display alerts sorted by timestamp, newest first.
-    for alert in sorted(alerts, key=lambda x: x.get('timestamp', ''), reverse=True):
-        timestamp_str = alert.get('timestamp')
-        timestamp = datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M') if timestamp_str else "Unknown"
-        st.error(f"**Patient:** {alert.get('patient_id')} at **{timestamp}** reported extreme pain (10/10).")
-        if st.button("Acknowledge & Dismiss", key=f"dismiss_{alert.get('alert_id')}"):
-            service.dismiss_alert(hospital_id, alert.get('alert_id'))
-            st.success("Alert dismissed.")
-            st.rerun()
\ No newline at end of file
+    # Alerts arrive presorted newest-first with timestamps already formatted.
+    # One form with checkboxes replaces a dismiss button per alert: clearing
+    # a ward's worth of alerts costs a single service call and one redraw.
+    with st.form("dismiss_alerts"):
+        picks = {}
+        for alert in alerts:
+            st.error(f"**Patient:** {alert.get('patient_id')} at **{alert['_ts_display']}** reported extreme pain (10/10).")
+            picks[alert.get('alert_id')] = st.checkbox(
+                "Acknowledge & dismiss", key=alert['_dismiss_key']
+            )
+        submitted = st.form_submit_button("Dismiss selected")
+    if submitted:
+        chosen = [alert_id for alert_id, checked in picks.items() if checked]
+        if not chosen:
+            st.warning("No alerts selected.")
+        else:
+            count = service.dismiss_alerts(hospital_id, chosen)
+            # Drop the cached list and banner count so the dismissal shows.
+            _sorted_pain_alerts.clear()
+            _pain_alert_count.clear()
+            st.success(f"Dismissed {count} alert(s).")
+            st.rerun(scope="fragment")
+
+def _render_own_notes_page(service, hospital_id):
+    """Renders the notes page scoped to the logged-in patient's own history."""
+    _render_view_notes_page(service, hospital_id, patient_id=st.session_state.current_user.username)
+
+
+def _clinician_alert_banner(service, hospital_id):
+    """Builds the dashboard warning banner for outstanding pain alerts, if any."""
+    alert_count = _pain_alert_count(service, hospital_id)
+    return f"🚨 {alert_count} high-priority alerts awaiting review." if alert_count else None
+
+
+# Per-role menu layout and sub-page handlers used by show_main_app. Defined
+# once at module level (after the render functions) so each rerun only does
+# dict lookups rather than rebuilding the menus and routing branches.
+_ROLE_CONFIG = {
+    'clinician': {
+        'title': "Clinician Dashboard",
+        'banner_fn': _clinician_alert_banner,
+        'menu': [
+            ("View Notes", "clinician_view_notes", "Browse patients' histories, search within notes, and review profiles."),
+            ("Add Note", "clinician_add_note", "Log a new clinical observation for any assigned patient."),
+            ("Messaging", "clinician_messaging", "Chat with patients in real time or leave care-team updates."),
+            ("AI Feedback", "clinician_feedback", "Review and finalize AI-generated responses before sending."),
+            ("Pain Alerts", "clinician_alerts", "Respond to any critical 10/10 pain alerts reported by patients."),
+            ("My Profile", "clinician_profile", "Update your personal and professional details."),
+        ],
+        'handlers': {
+            "clinician_view_notes": _render_view_notes_page,
+            "clinician_add_note": _render_add_note_page,
+            "clinician_messaging": _render_clinician_chat_page,
+            "clinician_feedback": _render_review_feedback_page,
+            "clinician_alerts": _render_pain_alerts_page,
+            "clinician_profile": _render_profile_page,
+        },
+    },
+    'patient': {
+        'title': "Patient Hub",
+        'menu': [
+            ("Add Entry", "patient_add_entry", "Log how you feel today, including mood, pain, and appetite."),
+            ("View Notes", "patient_view_notes", "See your full care history and any clinician notes."),
+            ("Messaging", "patient_messaging", "Reach your care team or chat privately with assigned clinicians."),
+            ("My Profile", "patient_profile", "Edit your personal information and preferences."),
+        ],
+        'handlers': {
+            "patient_add_entry": _render_add_patient_entry_page,
+            "patient_view_notes": _render_own_notes_page,
+            "patient_messaging": _render_patient_chat_page,
+            "patient_profile": _render_profile_page,
+        },
+    },
+    'admin': {
+        'title': "Admin Console",
+        'menu': [
+            ("User Management", "admin_users", "Approve new users, edit accounts, and export hospital data."),
+            ("Assign Clinicians", "admin_assign", "Pair clinicians with patients to streamline communication."),
+            ("My Profile", "admin_profile", "Maintain your administrator account details."),
+        ],
+        'handlers': {
+            "admin_users": _render_admin_page,
+            "admin_assign": _render_assign_clinicians_page,
+            "admin_profile": _render_profile_page,
+        },
+    },
+}
@@ -39,14 +39,22 @@ def get_carelog_service():
 service = get_carelog_service()
 
 # Session State Management
-# Initialize session state variables if they don't already exist.
-# This ensures that the app has a consistent state to work with.
-if 'current_user' not in st.session_state:
-    st.session_state.current_user = None
-if 'hospital_id' not in st.session_state:
-    st.session_state.hospital_id = None
-if 'auth_page' not in st.session_state:
-    st.session_state.auth_page = 'welcome'
+# Seed the session state variables in one setdefault pass instead of a
+# membership check per key; this runs on every rerun of the router.
+for _key, _default in (
+    ('current_user', None),
+    ('hospital_id', None),
+    ('auth_page', 'welcome'),
+):
+    st.session_state.setdefault(_key, _default)
+
+# Routes for unauthenticated sessions; a dict lookup replaces the chained
+# string comparisons and falls back to the welcome page on unknown state.
+_AUTH_ROUTES = {
+    'welcome': lambda service: gui.show_welcome_page(),
+    'login': gui.show_login_form,
+    'register': gui.show_register_form,
+}
 
 # Main App Router
 # This is the core logic that determines what the user sees.
@@ -56,9 +64,4 @@ if st.session_state.current_user and st.session_state.hospital_id:
 else:
     # If the user is not logged in, route them to the appropriate authentication page.
     # This allows for a multi-step login/registration process.
-    if st.session_state.auth_page == 'welcome':
-        gui.show_welcome_page()
-    elif st.session_state.auth_page == 'login':
-        gui.show_login_form(service)
-    elif st.session_state.auth_page == 'register':
-        gui.show_register_form(service)
+    _AUTH_ROUTES.get(st.session_state.auth_page, _AUTH_ROUTES['welcome'])(service)
@@ -11,9 +11,20 @@ It defines the `CareLogService` class, which is responsible for:
 """
 # carelog/modules/auth.py
 
-import json
 import hashlib
 import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHash, VerifyMismatchError
 from cryptography.fernet import InvalidToken
 from modules.encryption import encryptor
 from modules.models import User, PatientNote
@@ -22,6 +33,29 @@ from modules.chat import ChatService
 
 DATA_FILE = 'records.json'
 
+# Data files written by _save_data start with this magic, followed by a
+# sequence of length-prefixed Fernet tokens that each encrypt up to
+# _CHUNK_SIZE bytes of the serialized store. Encrypting in chunks keeps the
+# peak allocation per token bounded (Fernet base64-encodes, so a single
+# token briefly holds several copies of the whole payload). Files without
+# the magic are read as the legacy single-token format.
+_CHUNK_MAGIC = b'CLG1'
+_CHUNK_SIZE = 1 << 20
+
+# Argon2id hasher with RFC 9106-aligned parameters. Argon2 is memory-hard,
+# so offline guessing is orders of magnitude more expensive than with the
+# old salted SHA-256, and the salt is encoded inside the hash string itself.
+_password_hasher = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=4)
+
+# One precompiled pattern per password strength rule; search() stops at the
+# first matching character instead of testing every character per rule.
+_PW_RULES = (
+    re.compile(r'[A-Z]'),
+    re.compile(r'[a-z]'),
+    re.compile(r'[0-9]'),
+    re.compile(r'[^a-zA-Z0-9]'),
+)
+
 class CareLogService:
     """Manages all business logic and data for the CareLog application."""
     def __init__(self):
@@ -29,6 +63,51 @@ class CareLogService:
         self.current_user = None
         self._data = self._load_data()
         self._ensure_hospital_defaults()
+        # Per-hospital counters bumped whenever patient-clinician assignments
+        # change, letting callers cheaply validate cached assignment data.
+        self._assignments_versions = {}
+        # Per-hospital counters bumped whenever users or notes change, used
+        # the same way to key caches of roster and note data.
+        self._data_versions = {}
+        # Per-hospital counters bumped by ChatService on every message write
+        # or clear, so chat pollers can skip fetching when nothing changed.
+        self._chat_versions = {}
+        # Lazily built per-hospital note lookup tables; see _note_index.
+        self._note_indexes = {}
+        # Lazily built per-hospital role lookup tables; see _user_index.
+        self._user_indexes = {}
+        # Lazily built per-hospital sender-to-thread tables; see _sender_index.
+        self._sender_indexes = {}
+        # Lazily built per-hospital lowercased note text; see search_notes.
+        self._search_indexes = {}
+        # Memoized per-clinician assigned-patient sets; see get_pending_feedback.
+        self._assigned_sets = {}
+        # The service is shared across sessions via st.cache_resource, so
+        # concurrent reruns can save at the same time; serialize the writes.
+        self._save_lock = threading.Lock()
+        # Mutations take a per-hospital re-entrant lock: every public API is
+        # scoped by hospital_id, so sessions from different hospitals never
+        # contend with each other. Re-entrant so bulk helpers can nest the
+        # single-record ones.
+        self._hospital_locks = defaultdict(threading.RLock)
+        # Guards creation of new hospital entries, which happens before
+        # there is a per-hospital lock worth taking.
+        self._meta_lock = threading.Lock()
+        # Depth of nested `transaction()` blocks, tracked per thread: the
+        # service is shared across sessions, so one session's transaction
+        # must not turn another session's saves or flushes into no-ops.
+        # While the calling thread's depth is positive, _save_data only
+        # marks the store dirty; the encrypted write happens once when the
+        # outermost block exits (see `flush`).
+        self._txn_state = threading.local()
+        self._dirty = False
+        # Saves run on a dedicated daemon thread so the request path only
+        # pays for a queue put. maxsize=1 coalesces: a burst of mutations
+        # while a write is in flight results in one follow-up write that
+        # snapshots the latest state. `flush()` is the durability barrier.
+        self._write_queue = queue.Queue(maxsize=1)
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
         self.chat = ChatService(self)
 
     def _load_data(self):
@@ -38,26 +117,188 @@ class CareLogService:
             dict: The loaded data, or a new dictionary if the file doesn't exist or is corrupt.
         """
         try:
-            with open(DATA_FILE, 'r') as f:
-                encrypted_data = f.read()
-                if not encrypted_data:
+            # A buffer sized to the chunk length means each length-prefixed
+            # token is served from one underlying read instead of many
+            # default-sized ones.
+            with open(DATA_FILE, 'rb', buffering=_CHUNK_SIZE) as f:
+                magic = f.read(len(_CHUNK_MAGIC))
+                if not magic:
                     return {"hospitals": {}}
-                decrypted_data = encryptor.decrypt(encrypted_data.encode()).decode()
-                data = json.loads(decrypted_data)
+                if magic == _CHUNK_MAGIC:
+                    # Chunked format: decrypt one length-prefixed token at
+                    # a time instead of the whole file in one call.
+                    plain_parts = []
+                    while True:
+                        header = f.read(4)
+                        if not header:
+                            break
+                        if len(header) < 4:
+                            raise InvalidToken("truncated chunk header")
+                        (token_len,) = struct.unpack('>I', header)
+                        token = f.read(token_len)
+                        if len(token) < token_len:
+                            raise InvalidToken("truncated chunk")
+                        plain_parts.append(encryptor.decrypt(token))
+                    serialized = b''.join(plain_parts)
+                else:
+                    # Legacy format: the whole file is one Fernet token.
+                    serialized = encryptor.decrypt(magic + f.read())
+                # orjson accepts the decrypted bytes directly, skipping the
+                # intermediate str decode of the whole payload.
+                data = orjson.loads(serialized)
                 if 'hospitals' not in data:
                     data['hospitals'] = {}
-                return data
-        except (FileNotFoundError, InvalidToken, json.JSONDecodeError) as e:
+                return self._intern_repeated_values(data)
+        except (FileNotFoundError, InvalidToken, orjson.JSONDecodeError) as e:
             # If the file is missing, corrupt, or invalid, start with a fresh data structure.
             print(f"Warning: Could not load data file ({e}). Starting with a new dataset.")
             return {"hospitals": {}}
 
+    @staticmethod
+    def _intern_repeated_values(data):
+        """Interns enumerated string values repeated across loaded records.
+
+        orjson already interns dict keys while parsing, but values such as
+        roles, statuses and per-note patient IDs come back as a distinct
+        string object per record; in a store with thousands of notes those
+        duplicates dominate the footprint. Interning collapses each
+        repeated value to a single shared object.
+
+        Args:
+            data (dict): The freshly parsed data store.
+
+        Returns:
+            dict: The same store with repeated values interned in place.
+        """
+        for hospital_data in data.get('hospitals', {}).values():
+            for user_data in hospital_data.get('users', {}).values():
+                for field in ('role', 'status'):
+                    value = user_data.get(field)
+                    if isinstance(value, str):
+                        user_data[field] = sys.intern(value)
+            for note in hospital_data.get('notes', []):
+                for field in ('source', 'patient_id', 'author_id'):
+                    value = note.get(field)
+                    if isinstance(value, str):
+                        note[field] = sys.intern(value)
+        return data
+
     def _save_data(self):
-        """Encrypts and saves the current data to the JSON file."""
-        with open(DATA_FILE, 'w') as f:
-            data_to_encrypt = json.dumps(self._data, indent=4)
-            encrypted_data = encryptor.encrypt(data_to_encrypt.encode())
-            f.write(encrypted_data.decode())
+        """Requests that the current data be encrypted and saved to disk.
+
+        The serialize-encrypt-fsync cycle runs on the background writer
+        thread, so callers on the request path only pay for a queue put.
+        Inside a `transaction()` block even that is deferred: the store is
+        only marked dirty and enqueued once when the outermost block exits.
+        Call `flush()` to wait for the data to actually reach disk.
+        """
+        self._dirty = True
+        if self._in_transaction():
+            return
+        try:
+            self._write_queue.put_nowait(None)
+        except queue.Full:
+            # A write request is already pending; it will pick up this
+            # change when the writer thread snapshots the store.
+            pass
+
+    def _writer_loop(self):
+        """Daemon loop that performs the queued encrypt-and-write cycles."""
+        while True:
+            self._write_queue.get()
+            try:
+                self._write_sync()
+            except Exception as e:
+                # Keep the writer alive and re-queue the cycle ourselves:
+                # without this, a failed write would only be retried if an
+                # unrelated mutation happened to arrive, and flush() would
+                # return while the change was still lost. The token is
+                # enqueued before task_done so join() keeps blocking until
+                # a write actually succeeds.
+                print(f"Warning: background save failed ({e}); retrying.")
+                try:
+                    self._write_queue.put_nowait(None)
+                except queue.Full:
+                    pass
+                # Don't hot-loop against a persistently failing disk.
+                time.sleep(1.0)
+            finally:
+                self._write_queue.task_done()
+
+    def _write_sync(self):
+        """Encrypts and writes the current data to the JSON file.
+
+        Serialized with a lock so overlapping writes cannot interleave
+        partial output in the data file.
+        """
+        with self._save_lock:
+            # orjson serializes straight to bytes; the memoryview lets the
+            # chunk loop slice it without copying the whole payload again.
+            payload = memoryview(orjson.dumps(self._data))
+            # Write to a sibling temp file and atomically rename it over the
+            # data file. A crash mid-write can then never leave a truncated
+            # records.json behind: readers see either the old or the new
+            # file, never a partial one.
+            tmp_file = DATA_FILE + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(_CHUNK_MAGIC)
+                for start in range(0, len(payload), _CHUNK_SIZE):
+                    token = encryptor.encrypt(bytes(payload[start:start + _CHUNK_SIZE]))
+                    f.write(struct.pack('>I', len(token)))
+                    f.write(token)
+                f.flush()
+                # fdatasync skips flushing file metadata (mtime etc.) that
+                # the durability of the payload does not depend on; fall
+                # back to fsync on platforms without it.
+                if hasattr(os, 'fdatasync'):
+                    os.fdatasync(f.fileno())
+                else:
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, DATA_FILE)
+            # Only mark the store clean once the new file is in place; if
+            # anything above raised, the flag still says there is unsaved
+            # work and the writer loop re-queues the cycle. A mutation that
+            # lands mid-write re-dirties the flag after this line and its
+            # own enqueued cycle rewrites the file with the newer data.
+            self._dirty = False
+
+    def _in_transaction(self):
+        """Returns True while the calling thread is inside `transaction()`."""
+        return getattr(self._txn_state, 'depth', 0) > 0
+
+    def flush(self):
+        """Blocks until every pending change has reached disk.
+
+        Inside the calling thread's own `transaction()` block this is a
+        no-op - the outermost exit flushes. Transactions on other threads
+        don't weaken the barrier: their deferred work is still marked
+        dirty, so this enqueues a write covering it as well.
+        """
+        if self._in_transaction():
+            return
+        if self._dirty:
+            self._save_data()
+        self._write_queue.join()
+
+    @contextmanager
+    def transaction(self):
+        """Coalesces the saves from a multi-step mutation into one write.
+
+        Every encrypt-and-write cycle re-serializes the whole data store, so
+        a batch that saves after each step pays that cost N times for one
+        logical change. Code run inside this block can call `_save_data`
+        after every mutation as usual; the actual write is deferred until the
+        outermost block exits, and skipped entirely if nothing was changed.
+        Blocks may nest. The depth is per-thread, so concurrent sessions
+        keep their normal save behavior while one runs a batch.
+        """
+        self._txn_state.depth = getattr(self._txn_state, 'depth', 0) + 1
+        try:
+            yield self
+        finally:
+            self._txn_state.depth -= 1
+            if self._txn_state.depth == 0:
+                self.flush()
 
     def _ensure_hospital_defaults(self):
         """Ensures that all hospital records have the default data structures."""
@@ -70,6 +311,101 @@ class CareLogService:
             chats.setdefault('general', {})
             chats.setdefault('direct', {})
 
+    def _note_index(self, hospital_id):
+        """Returns (by_id, by_patient) lookup tables for a hospital's notes.
+
+        Notes are stored as a flat list, so locating one by ID or collecting
+        a patient's history used to scan every note on every call. The index
+        is built once per mutation instead: service writes invalidate it via
+        `_bump_data_version`, and a token of the list's identity and length
+        catches code (tests, mainly) that swaps or appends to the list
+        directly.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            tuple: A dict mapping note_id to note, and a dict mapping
+                   patient_id to that patient's notes in storage order.
+        """
+        notes = self._data['hospitals'].get(hospital_id, {}).get('notes', [])
+        token = (id(notes), len(notes))
+        cached = self._note_indexes.get(hospital_id)
+        if cached and cached[0] == token:
+            return cached[1], cached[2]
+        by_id = {}
+        by_patient = {}
+        for note in notes:
+            note_id = note.get('note_id')
+            if note_id is not None:
+                by_id[note_id] = note
+            by_patient.setdefault(note.get('patient_id'), []).append(note)
+        self._note_indexes[hospital_id] = (token, by_id, by_patient)
+        return by_id, by_patient
+
+    def _user_index(self, hospital_id):
+        """Returns (by_role, pending_by_role) lookup tables for a hospital.
+
+        Roster pages filter the full user dict by role on every rerun; the
+        tables group users once per mutation instead. Invalidation works the
+        same way as for `_note_index`: service writes go through
+        `_bump_data_version`, and the identity-and-length token catches
+        direct swaps of the user dict.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            tuple: A dict mapping role to users of that role, and a dict
+                   mapping role to users of that role awaiting approval.
+        """
+        users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
+        token = (id(users), len(users))
+        cached = self._user_indexes.get(hospital_id)
+        if cached and cached[0] == token:
+            return cached[1], cached[2]
+        by_role = {}
+        pending_by_role = {}
+        for user_data in users.values():
+            role = user_data.get('role')
+            by_role.setdefault(role, []).append(user_data)
+            if user_data.get('status') == 'pending':
+                pending_by_role.setdefault(role, []).append(user_data)
+        self._user_indexes[hospital_id] = (token, by_role, pending_by_role)
+        return by_role, pending_by_role
+
+    def _sender_index(self, hospital_id):
+        """Returns a map of sender username to the chat threads they posted in.
+
+        Deleting a clinician or admin used to rewrite every chat thread in
+        the hospital to strip their messages; with this table only threads
+        that actually contain them are touched. Thread keys are
+        ('general', patient) or ('direct', patient, clinician). The table is
+        rebuilt whenever the chat or data version moves, which every chat
+        write and user mutation bumps.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            dict: A mapping of sender username to a set of thread keys.
+        """
+        versions = (self.chat_version(hospital_id), self.data_version(hospital_id))
+        cached = self._sender_indexes.get(hospital_id)
+        if cached and cached[0] == versions:
+            return cached[1]
+        chats = self._data['hospitals'].get(hospital_id, {}).get('chats', {})
+        by_sender = {}
+        for patient, messages in chats.get('general', {}).items():
+            for msg in messages:
+                by_sender.setdefault(msg.get('sender'), set()).add(('general', patient))
+        for patient, threads in chats.get('direct', {}).items():
+            for clinician, messages in threads.items():
+                for msg in messages:
+                    by_sender.setdefault(msg.get('sender'), set()).add(('direct', patient, clinician))
+        self._sender_indexes[hospital_id] = (versions, by_sender)
+        return by_sender
+
     def register_user(self, username, password, role, hospital_id, full_name, dob, sex, pronouns, bio):
         """Registers a new user, handling password hashing and approval logic.
 
@@ -89,55 +425,56 @@ class CareLogService:
         """
         if not self._is_strong_password(password):
             return 'weak_password'
-        is_new_hospital = hospital_id not in self._data['hospitals']
-
-        # Only an admin can create a new hospital.
-        if is_new_hospital and role != 'admin':
-            return 'hospital_not_found'
-
-        if is_new_hospital:
-            self._data['hospitals'][hospital_id] = {
-                "users": {},
-                "notes": [],
-                "alerts": [],
-                "chats": {
-                    "general": {},
-                    "direct": {}
+
+        with self._meta_lock:
+            is_new_hospital = hospital_id not in self._data['hospitals']
+
+            # Only an admin can create a new hospital.
+            if is_new_hospital and role != 'admin':
+                return 'hospital_not_found'
+
+            if is_new_hospital:
+                self._data['hospitals'][hospital_id] = {
+                    "users": {},
+                    "notes": [],
+                    "alerts": [],
+                    "chats": {
+                        "general": {},
+                        "direct": {}
+                    }
                 }
+            else:
+                self._ensure_hospital_defaults()
+
+        with self._hospital_locks[hospital_id]:
+            hospital_users = self._data['hospitals'][hospital_id]['users']
+            user_key = f"{username}_{role}"
+
+            if user_key in hospital_users:
+                return False
+
+            # Argon2id encodes its own salt and cost parameters into the hash.
+            password_hash = _password_hasher.hash(password)
+
+            # New clinicians and admins require approval unless it's a new hospital.
+            status = 'approved'
+            if (role == 'admin' or role == 'clinician') and not is_new_hospital:
+                status = 'pending'
+
+            hospital_users[user_key] = {
+                'username': username,
+                'password_hash': password_hash,
+                'role': role,
+                'status': status,
+                'full_name': full_name,
+                'dob': dob,
+                'sex': sex,
+                'pronouns': pronouns,
+                'bio': bio,
+                'assigned_clinicians': [] # Specific to patients
             }
-        else:
-            self._ensure_hospital_defaults()
-        
-        hospital_users = self._data['hospitals'][hospital_id]['users']
-        user_key = f"{username}_{role}"
-        
-        if user_key in hospital_users:
-            return False
-
-        # Hash the password with a unique salt.
-        salt = os.urandom(16).hex()
-        password_to_hash = salt + password
-        password_hash = hashlib.sha256(password_to_hash.encode()).hexdigest()
-        
-        # New clinicians and admins require approval unless it's a new hospital.
-        status = 'approved'
-        if (role == 'admin' or role == 'clinician') and not is_new_hospital:
-            status = 'pending'
-
-        hospital_users[user_key] = {
-            'username': username,
-            'password_hash': password_hash,
-            'role': role,
-            'salt': salt,
-            'status': status,
-            'full_name': full_name,
-            'dob': dob,
-            'sex': sex,
-            'pronouns': pronouns,
-            'bio': bio,
-            'assigned_clinicians': [] # Specific to patients
-        }
-        self._save_data()
+            self._save_data()
+            self._bump_data_version(hospital_id)
         if status == 'pending':
             return 'pending'
         return True
@@ -146,11 +483,7 @@ class CareLogService:
         """Checks if a password meets the defined strength criteria."""
         if len(password) < 8:
             return False
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(not c.isalnum() for c in password)
-        return has_upper and has_lower and has_digit and has_special
+        return all(rule.search(password) for rule in _PW_RULES)
 
     def login(self, username, password, role, hospital_id):
         """Authenticates a user and sets the current user session.
@@ -177,24 +510,46 @@ class CareLogService:
             if user_data.get('status') == 'pending':
                 return 'pending'
 
-            salt = user_data.get('salt')
-            if not salt:
-                 return 'error' # Indicates a data integrity issue.
-            password_to_check = salt + password
-            hash_to_check = hashlib.sha256(password_to_check.encode()).hexdigest()
-
-            if user_data.get('password_hash') == hash_to_check:
-                self.current_user = User(
-                    username=user_data['username'],
-                    password_hash=user_data['password_hash'],
-                    role=user_data['role'],
-                    full_name=user_data.get('full_name'),
-                    dob=user_data.get('dob'),
-                    sex=user_data.get('sex'),
-                    pronouns=user_data.get('pronouns'),
-                    bio=user_data.get('bio')
-                )
-                return self.current_user
+            stored_hash = user_data.get('password_hash', '')
+            if stored_hash.startswith('$argon2'):
+                try:
+                    _password_hasher.verify(stored_hash, password)
+                except (VerifyMismatchError, InvalidHash):
+                    return None
+                # Transparently re-hash when the cost parameters change.
+                if _password_hasher.check_needs_rehash(stored_hash):
+                    with self._hospital_locks[hospital_id]:
+                        user_data['password_hash'] = _password_hasher.hash(password)
+                        self._save_data()
+            else:
+                # Legacy salted SHA-256 record: verify the old way, then
+                # upgrade to Argon2id on this successful login.
+                salt = user_data.get('salt')
+                if not salt:
+                    return 'error' # Indicates a data integrity issue.
+                # Concatenating the encoded parts avoids building an
+                # intermediate salt+password str; UTF-8 of the concatenation
+                # equals the concatenation of the UTF-8 parts, so legacy
+                # hashes still verify.
+                hash_to_check = hashlib.sha256(salt.encode() + password.encode()).hexdigest()
+                if stored_hash != hash_to_check:
+                    return None
+                with self._hospital_locks[hospital_id]:
+                    user_data['password_hash'] = _password_hasher.hash(password)
+                    user_data.pop('salt', None)
+                    self._save_data()
+
+            self.current_user = User(
+                username=user_data['username'],
+                password_hash=user_data['password_hash'],
+                role=user_data['role'],
+                full_name=user_data.get('full_name'),
+                dob=user_data.get('dob'),
+                sex=user_data.get('sex'),
+                pronouns=user_data.get('pronouns'),
+                bio=user_data.get('bio')
+            )
+            return self.current_user
         return None
         
     def logout(self):
@@ -209,13 +564,17 @@ class CareLogService:
             hospital_id (str): The ID of the hospital.
         """
         if hospital_id in self._data['hospitals']:
-            self._data['hospitals'][hospital_id]['notes'].append(note.__dict__)
-            # Create an alert if pain is reported as 10/10.
-            if note.pain == 10 and note.source == 'patient':
-                alert = {"alert_id": str(note.note_id), "patient_id": note.patient_id, "timestamp": note.timestamp, "status": "new"}
-                if 'alerts' not in self._data['hospitals'][hospital_id]: self._data['hospitals'][hospital_id]['alerts'] = []
-                self._data['hospitals'][hospital_id]['alerts'].append(alert)
-            self._save_data()
+            with self._hospital_locks[hospital_id]:
+                # Slotted dataclasses have no __dict__; asdict builds the
+                # stored record from the fields.
+                self._data['hospitals'][hospital_id]['notes'].append(asdict(note))
+                # Create an alert if pain is reported as 10/10.
+                if note.pain == 10 and note.source == 'patient':
+                    alert = {"alert_id": str(note.note_id), "patient_id": note.patient_id, "timestamp": note.timestamp, "status": "new"}
+                    if 'alerts' not in self._data['hospitals'][hospital_id]: self._data['hospitals'][hospital_id]['alerts'] = []
+                    self._data['hospitals'][hospital_id]['alerts'].append(alert)
+                self._save_data()
+                self._bump_data_version(hospital_id)
 
     def generate_and_store_ai_feedback(self, note_id: str, hospital_id: str) -> bool:
         """Generates AI feedback for a specific note and stores it with a 'pending' status.
@@ -228,46 +587,59 @@ class CareLogService:
             bool: True if feedback was generated and stored, False otherwise.
         """
         if hospital_id in self._data['hospitals']:
-            for note in self._data['hospitals'][hospital_id]['notes']:
-                if note['note_id'] == note_id:
-                    notes_text = note.get('notes', '')
-                    mood_val = note.get('mood', 5)
-                    pain_val = note.get('pain', 5)
-                    appetite_val = note.get('appetite', 5)
-                    feedback = generate_feedback(notes_text, mood_val, pain_val, appetite_val)
-                    if feedback:
+            by_id, _ = self._note_index(hospital_id)
+            note = by_id.get(note_id)
+            if note is not None:
+                notes_text = note.get('notes', '')
+                mood_val = note.get('mood', 5)
+                pain_val = note.get('pain', 5)
+                appetite_val = note.get('appetite', 5)
+                # The model call stays outside the lock; it can take seconds.
+                feedback = generate_feedback(notes_text, mood_val, pain_val, appetite_val)
+                if feedback:
+                    with self._hospital_locks[hospital_id]:
                         note['ai_feedback'] = {
                             "text": feedback,
                             "status": "pending"
                         }
                         self._save_data()
-                        return True
+                        self._bump_data_version(hospital_id)
+                    return True
         return False
 
-    def get_notes_for_patient(self, hospital_id: str, patient_id: str) -> list:
+    def get_notes_for_patient(self, hospital_id: str, patient_id: str, viewer: tuple | None = None) -> list:
         """Retrieves all notes for a specific patient, applying access control rules.
 
         Args:
             hospital_id (str): The ID of the hospital.
             patient_id (str): The ID of the patient.
+            viewer (tuple, optional): The (username, role) the access rules
+                apply to. The service is shared across sessions, so callers
+                that cache results must pass their own viewer explicitly
+                rather than rely on the ambient `current_user`, which may
+                belong to whichever session logged in last.
 
         Returns:
             list: A list of note dictionaries.
         """
-        hospital_data = self._data['hospitals'].get(hospital_id, {})
-        all_patient_notes = [n for n in hospital_data.get('notes', []) if n.get('patient_id') == patient_id]
-        
+        if viewer is None and self.current_user:
+            viewer = (self.current_user.username, self.current_user.role)
+
+        _, by_patient = self._note_index(hospital_id)
+        all_patient_notes = by_patient.get(patient_id, [])
+
         # Clinicians can only see notes for patients they are assigned to.
-        if self.current_user and self.current_user.role == 'clinician':
+        if viewer and viewer[1] == 'clinician':
+            viewer_username = viewer[0]
             patient_user_key = f"{patient_id}_patient"
-            patient_data = hospital_data.get('users', {}).get(patient_user_key, {})
+            patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_user_key, {})
             assigned_clinicians = patient_data.get('assigned_clinicians', [])
 
-            if self.current_user.username in assigned_clinicians:
+            if viewer_username in assigned_clinicians:
                 # Filter out private patient notes.
                 return [n for n in all_patient_notes if not (n.get('source') == 'patient' and n.get('is_private'))]
             return [] # Return no notes if not assigned.
-        return all_patient_notes # Patients and admins can see all notes.
+        return list(all_patient_notes) # Patients and admins can see all notes.
 
     def get_pending_feedback(self, hospital_id: str) -> list:
         """Retrieves all notes with AI feedback awaiting approval.
@@ -280,11 +652,17 @@ class CareLogService:
         """
         pending_feedback = []
         
-        # Get a set of assigned patient IDs for efficient filtering for clinicians.
+        # Get a set of assigned patient IDs for efficient filtering for
+        # clinicians. Dashboards poll this repeatedly, so the set is memoized
+        # per clinician and dropped whenever assignments or users change
+        # (every such mutation bumps the data version).
         assigned_patient_ids = None
         if self.current_user and self.current_user.role == 'clinician':
-            assigned_patients_data = self.get_all_patients(hospital_id)
-            assigned_patient_ids = {p['username'] for p in assigned_patients_data}
+            hospital_sets = self._assigned_sets.setdefault(hospital_id, {})
+            assigned_patient_ids = hospital_sets.get(self.current_user.username)
+            if assigned_patient_ids is None:
+                assigned_patient_ids = {p['username'] for p in self.get_all_patients(hospital_id)}
+                hospital_sets[self.current_user.username] = assigned_patient_ids
 
         if hospital_id in self._data['hospitals']:
             for note in self._data['hospitals'][hospital_id]['notes']:
@@ -309,13 +687,15 @@ class CareLogService:
             bool: True if successful, False otherwise.
         """
         if hospital_id in self._data['hospitals']:
-            for note in self._data['hospitals'][hospital_id]['notes']:
-                if note['note_id'] == note_id:
-                    if note.get('ai_feedback'):
-                        note['ai_feedback']['text'] = edited_feedback_text
-                        note['ai_feedback']['status'] = 'approved' 
-                        self._save_data()
-                        return True
+            with self._hospital_locks[hospital_id]:
+                by_id, _ = self._note_index(hospital_id)
+                note = by_id.get(note_id)
+                if note is not None and note.get('ai_feedback'):
+                    note['ai_feedback']['text'] = edited_feedback_text
+                    note['ai_feedback']['status'] = 'approved'
+                    self._save_data()
+                    self._bump_data_version(hospital_id)
+                    return True
         return False
 
     def reject_ai_feedback(self, note_id: str, hospital_id: str) -> bool:
@@ -329,12 +709,14 @@ class CareLogService:
             bool: True if successful, False otherwise.
         """
         if hospital_id in self._data['hospitals']:
-            for note in self._data['hospitals'][hospital_id]['notes']:
-                if note.get('note_id') == note_id:
-                    if 'ai_feedback' in note:
-                        del note['ai_feedback']
-                        self._save_data()
-                        return True
+            with self._hospital_locks[hospital_id]:
+                by_id, _ = self._note_index(hospital_id)
+                note = by_id.get(note_id)
+                if note is not None and 'ai_feedback' in note:
+                    del note['ai_feedback']
+                    self._save_data()
+                    self._bump_data_version(hospital_id)
+                    return True
         return False
 
     def delete_note(self, note_id: str, hospital_id: str) -> bool:
@@ -347,33 +729,44 @@ class CareLogService:
         Returns:
             bool: True if successful, False otherwise.
         """
-        if hospital_id in self._data['hospitals']:
-            self._data['hospitals'][hospital_id]['notes'] = [n for n in self._data['hospitals'][hospital_id]['notes'] if n['note_id'] != note_id]
-            self._save_data()
+        hospital = self._data['hospitals'].get(hospital_id)
+        if hospital is not None:
+            with self._hospital_locks[hospital_id]:
+                by_id, _ = self._note_index(hospital_id)
+                note = by_id.get(note_id)
+                if note is not None:
+                    hospital['notes'].remove(note)
+                self._save_data()
+                self._bump_data_version(hospital_id)
             return True
         return False
 
-    def get_all_patients(self, hospital_id: str) -> list:
+    def get_all_patients(self, hospital_id: str, viewer: tuple | None = None) -> list:
         """Retrieves a list of all patients in a hospital, respecting clinician assignments.
 
         Args:
             hospital_id (str): The ID of the hospital.
+            viewer (tuple, optional): The (username, role) the assignment
+                filter applies to; defaults to the ambient `current_user`.
+                Callers that cache results keyed per viewer must pass it
+                explicitly, since `current_user` is shared across sessions.
 
         Returns:
             list: A list of patient user data dictionaries.
         """
-        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
-        current_user = self.current_user
-        patient_list = []
-        for user_data in hospital_users.values():
-            if user_data.get('role') == 'patient':
-                # Clinicians only see patients they are assigned to.
-                if current_user.role == 'clinician':
-                    if current_user.username in user_data.get('assigned_clinicians', []):
-                        patient_list.append(user_data)
-                else: # Admins see all patients.
-                    patient_list.append(user_data)
-        return patient_list
+        if viewer is None and self.current_user:
+            viewer = (self.current_user.username, self.current_user.role)
+
+        by_role, _ = self._user_index(hospital_id)
+        patients = by_role.get('patient', [])
+        # Clinicians only see patients they are assigned to.
+        if viewer and viewer[1] == 'clinician':
+            viewer_username = viewer[0]
+            return [
+                user_data for user_data in patients
+                if viewer_username in user_data.get('assigned_clinicians', [])
+            ]
+        return list(patients) # Admins see all patients.
 
     def get_all_users(self, hospital_id: str) -> dict:
         """Retrieves all users for a given hospital.
@@ -400,6 +793,25 @@ class CareLogService:
         user_key = f"{username}_{role}"
         return self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(user_key, {})
 
+    def get_users_by_usernames(self, hospital_id: str, pairs) -> dict:
+        """Retrieves multiple users' data in a single batched lookup.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+            pairs: An iterable of (username, role) tuples identifying the users.
+
+        Returns:
+            dict: A mapping of (username, role) tuples to user data dictionaries.
+                  Pairs with no matching user are omitted.
+        """
+        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
+        resolved = {}
+        for username, role in pairs:
+            user_data = hospital_users.get(f"{username}_{role}")
+            if user_data:
+                resolved[(username, role)] = user_data
+        return resolved
+
     def get_hospital_dataset(self, hospital_id: str) -> dict:
         """Retrieves the entire dataset for a specific hospital.
 
@@ -429,12 +841,8 @@ class CareLogService:
         Returns:
             list: A list of pending user data dictionaries.
         """
-        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
-        pending_users = []
-        for user_key, user_data in hospital_users.items():
-            if user_data.get('role') == role and user_data.get('status') == 'pending':
-                pending_users.append(user_data)
-        return pending_users
+        _, pending_by_role = self._user_index(hospital_id)
+        return list(pending_by_role.get(role, []))
 
     def approve_user(self, username: str, role: str, hospital_id: str) -> bool:
         """Approves a pending user, changing their status to 'approved'.
@@ -447,14 +855,43 @@ class CareLogService:
         Returns:
             bool: True if successful, False otherwise.
         """
-        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
-        user_key = f"{username}_{role}"
-        if user_key in hospital_users:
-            hospital_users[user_key]['status'] = 'approved'
-            self._save_data()
-            return True
+        with self._hospital_locks[hospital_id]:
+            hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
+            user_key = f"{username}_{role}"
+            if user_key in hospital_users:
+                hospital_users[user_key]['status'] = 'approved'
+                self._save_data()
+                self._bump_data_version(hospital_id)
+                return True
         return False
 
+    def approve_users_bulk(self, users: list, hospital_id: str) -> int:
+        """Approves several pending users with a single save.
+
+        Admins clearing a signup queue previously paid one encrypt-and-write
+        cycle (and one full page rerun) per approval; this batches the
+        status changes and persists once.
+
+        Args:
+            users (list): An iterable of (username, role) pairs to approve.
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            int: The number of users actually approved.
+        """
+        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
+        approved = 0
+        with self._hospital_locks[hospital_id], self.transaction():
+            for username, role in users:
+                user_data = hospital_users.get(f"{username}_{role}")
+                if user_data and user_data.get('status') == 'pending':
+                    user_data['status'] = 'approved'
+                    approved += 1
+                    self._save_data()
+            if approved:
+                self._bump_data_version(hospital_id)
+        return approved
+
     def update_user_profile(self, hospital_id: str, username: str, role: str, details: dict) -> bool:
         """Updates a user's profile information and optionally their password.
 
@@ -468,26 +905,26 @@ class CareLogService:
             bool: True if successful, False otherwise.
         """
         user_key = f"{username}_{role}"
-        user_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(user_key)
-        if not user_data:
-            return False
+        with self._hospital_locks[hospital_id]:
+            user_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(user_key)
+            if not user_data:
+                return False
+
+            # Update profile fields.
+            user_data['full_name'] = details.get('full_name', user_data.get('full_name'))
+            user_data['dob'] = details.get('dob', user_data.get('dob'))
+            user_data['sex'] = details.get('sex', user_data.get('sex'))
+            user_data['pronouns'] = details.get('pronouns', user_data.get('pronouns'))
+            user_data['bio'] = details.get('bio', user_data.get('bio'))
+
+            # Update password if a new one is provided; changing it also
+            # retires any legacy salt field on the record.
+            if 'new_password' in details and details['new_password']:
+                user_data['password_hash'] = _password_hasher.hash(details['new_password'])
+                user_data.pop('salt', None)
 
-        # Update profile fields.
-        user_data['full_name'] = details.get('full_name', user_data.get('full_name'))
-        user_data['dob'] = details.get('dob', user_data.get('dob'))
-        user_data['sex'] = details.get('sex', user_data.get('sex'))
-        user_data['pronouns'] = details.get('pronouns', user_data.get('pronouns'))
-        user_data['bio'] = details.get('bio', user_data.get('bio'))
-
-        # Update password if a new one is provided.
-        if 'new_password' in details and details['new_password']:
-            salt = os.urandom(16).hex()
-            password_to_hash = salt + details['new_password']
-            password_hash = hashlib.sha256(password_to_hash.encode()).hexdigest()
-            user_data['salt'] = salt
-            user_data['password_hash'] = password_hash
-
-        self._save_data()
+            self._save_data()
+            self._bump_data_version(hospital_id)
         return True
 
     def update_note(self, hospital_id: str, note_id: str, updated_data: dict) -> bool:
@@ -501,11 +938,13 @@ class CareLogService:
         Returns:
             bool: True if successful, False otherwise.
         """
-        notes = self._data['hospitals'].get(hospital_id, {}).get('notes', [])
-        for note in notes:
-            if note.get('note_id') == note_id:
+        with self._hospital_locks[hospital_id]:
+            by_id, _ = self._note_index(hospital_id)
+            note = by_id.get(note_id)
+            if note is not None:
                 note.update(updated_data)
                 self._save_data()
+                self._bump_data_version(hospital_id)
                 return True
         return False
 
@@ -522,6 +961,43 @@ class CareLogService:
         Returns:
             bool: True if successful, False otherwise.
         """
+        with self._hospital_locks[hospital_id]:
+            if not self._delete_user_unsaved(hospital_id, username, role):
+                return False
+            self._save_data()
+            self._bump_data_version(hospital_id)
+        return True
+
+    def delete_users_bulk(self, users: list, hospital_id: str) -> int:
+        """Deletes several users with a single save.
+
+        Each user's associated data is cleaned up exactly as in
+        `delete_user`, but the encrypt-and-write step runs once for the
+        whole batch instead of once per user.
+
+        Args:
+            users (list): An iterable of (username, role) pairs to delete.
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            int: The number of users actually deleted.
+        """
+        deleted = 0
+        with self._hospital_locks[hospital_id], self.transaction():
+            for username, role in users:
+                if self._delete_user_unsaved(hospital_id, username, role):
+                    deleted += 1
+                    self._save_data()
+            if deleted:
+                self._bump_data_version(hospital_id)
+        return deleted
+
+    def _delete_user_unsaved(self, hospital_id: str, username: str, role: str) -> bool:
+        """Removes a user and their associated data without persisting.
+
+        Callers are responsible for saving and bumping the data version;
+        this lets bulk operations batch the expensive save.
+        """
         hospital = self._data['hospitals'].get(hospital_id)
         if not hospital:
             return False
@@ -553,38 +1029,59 @@ class CareLogService:
                     assigned = data.get('assigned_clinicians', [])
                     if assigned and username in assigned:
                         assigned.remove(username)
+                        self._bump_assignments_version(hospital_id)
             notes = hospital.get('notes', [])
             hospital['notes'] = [
                 n for n in notes
                 if not (n.get('author_id') == username and n.get('source') == 'clinician')
             ]
-            # Remove clinician from all chat threads.
+            # Remove the clinician's direct threads and strip their general
+            # messages; the sender index narrows the strip to the threads
+            # that actually contain them.
             direct_threads = chats.get('direct', {})
             for patient_username, threads in direct_threads.items():
                 if username in threads:
                     del threads[username]
-            general_threads = chats.get('general', {})
-            for patient_username, messages in general_threads.items():
-                general_threads[patient_username] = [
-                    msg for msg in messages if msg.get('sender') != username
-                ]
+            self._strip_sender_messages(hospital_id, username, direct=False)
         else: # Admin
-            # Remove admin messages from all chat threads.
-            general_threads = chats.get('general', {})
-            for patient_username, messages in general_threads.items():
-                general_threads[patient_username] = [
-                    msg for msg in messages if msg.get('sender') != username
-                ]
-            direct_threads = chats.get('direct', {})
-            for patient_username, threads in direct_threads.items():
-                for clinician_username, messages in list(threads.items()):
-                    threads[clinician_username] = [
-                        msg for msg in messages if msg.get('sender') != username
-                    ]
-
-        self._save_data()
+            # Remove admin messages from all chat threads they posted in.
+            self._strip_sender_messages(hospital_id, username, direct=True)
+
+        # Every branch above mutates chat threads, so chat pollers and the
+        # thread-listing caches must see a new version; removed thread
+        # objects also have to leave the chat service's reference cache.
+        self.chat._drop_cached_threads(hospital_id, username)
+        self._bump_chat_version(hospital_id)
         return True
 
+    def _strip_sender_messages(self, hospital_id: str, username: str, direct: bool):
+        """Removes a user's messages from the chat threads they posted in.
+
+        Uses `_sender_index` so only affected threads are rewritten rather
+        than every thread in the hospital.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+            username (str): The sender whose messages are removed.
+            direct (bool): Whether to also strip direct threads; general
+                           threads are always stripped.
+        """
+        chats = self._data['hospitals'].get(hospital_id, {}).get('chats', {})
+        general_threads = chats.get('general', {})
+        direct_threads = chats.get('direct', {})
+        # Slice-assign so the thread list object is rewritten in place; any
+        # reference already held to the thread sees the filtered messages.
+        for key in self._sender_index(hospital_id).get(username, ()):
+            if key[0] == 'general':
+                messages = general_threads.get(key[1])
+                if messages is not None:
+                    messages[:] = [msg for msg in messages if msg.get('sender') != username]
+            elif direct:
+                _, patient_username, clinician_username = key
+                messages = direct_threads.get(patient_username, {}).get(clinician_username)
+                if messages is not None:
+                    messages[:] = [msg for msg in messages if msg.get('sender') != username]
+
     def get_all_clinicians(self, hospital_id: str) -> list:
         """Retrieves a list of all approved clinicians in a hospital.
 
@@ -594,8 +1091,8 @@ class CareLogService:
         Returns:
             list: A list of clinician user data dictionaries.
         """
-        hospital_users = self._data['hospitals'].get(hospital_id, {}).get('users', {})
-        return [data for data in hospital_users.values() if data.get('role') == 'clinician' and data.get('status') == 'approved']
+        by_role, _ = self._user_index(hospital_id)
+        return [data for data in by_role.get('clinician', []) if data.get('status') == 'approved']
 
     def get_assigned_clinicians_for_patient(self, hospital_id: str, patient_username: str) -> list:
         """Retrieves the list of clinicians assigned to a specific patient.
@@ -611,6 +1108,69 @@ class CareLogService:
         patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_key, {})
         return patient_data.get('assigned_clinicians', []) or []
 
+    def assignments_version(self, hospital_id: str) -> int:
+        """Returns a counter that increments whenever assignments change.
+
+        Callers can key caches of assignment-derived data on this value and
+        rebuild only when it moves, instead of refetching on every access.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            int: The current assignment version for the hospital.
+        """
+        return self._assignments_versions.get(hospital_id, 0)
+
+    def _bump_assignments_version(self, hospital_id: str):
+        """Advances the hospital's assignment version counter."""
+        self._assignments_versions[hospital_id] = self._assignments_versions.get(hospital_id, 0) + 1
+
+    def data_version(self, hospital_id: str) -> int:
+        """Returns a counter that increments whenever users or notes change.
+
+        Callers can key caches of roster or note data on this value and
+        rebuild only when it moves, instead of refetching on every access.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            int: The current data version for the hospital.
+        """
+        return self._data_versions.get(hospital_id, 0)
+
+    def _bump_data_version(self, hospital_id: str):
+        """Advances the hospital's data version counter."""
+        self._data_versions[hospital_id] = self._data_versions.get(hospital_id, 0) + 1
+        # Every note and user mutation bumps the version, so this is also
+        # the single choke point for invalidating the lookup tables.
+        self._note_indexes.pop(hospital_id, None)
+        self._user_indexes.pop(hospital_id, None)
+        self._sender_indexes.pop(hospital_id, None)
+        self._search_indexes.pop(hospital_id, None)
+        self._assigned_sets.pop(hospital_id, None)
+
+    def chat_version(self, hospital_id: str) -> int:
+        """Returns a counter that increments whenever chat messages change.
+
+        Polling chat UIs compare this against the version they last fetched
+        at and skip the backend read entirely when it has not moved, while a
+        write (including the caller's own send) invalidates immediately.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+
+        Returns:
+            int: The current chat version for the hospital.
+        """
+        return self._chat_versions.get(hospital_id, 0)
+
+    def _bump_chat_version(self, hospital_id: str):
+        """Advances the hospital's chat version counter."""
+        self._chat_versions[hospital_id] = self._chat_versions.get(hospital_id, 0) + 1
+        self._sender_indexes.pop(hospital_id, None)
+
     def assign_clinician_to_patient(self, hospital_id: str, patient_username: str, clinician_username: str) -> bool:
         """Assigns a clinician to a patient.
 
@@ -623,14 +1183,18 @@ class CareLogService:
             bool: True if successful, False otherwise.
         """
         patient_key = f"{patient_username}_patient"
-        patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_key)
-        if patient_data:
-            if 'assigned_clinicians' not in patient_data:
-                patient_data['assigned_clinicians'] = []
-            if clinician_username not in patient_data['assigned_clinicians']:
-                patient_data['assigned_clinicians'].append(clinician_username)
-                self._save_data()
-                return True
+        with self._hospital_locks[hospital_id]:
+            patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_key)
+            if patient_data:
+                if 'assigned_clinicians' not in patient_data:
+                    patient_data['assigned_clinicians'] = []
+                if clinician_username not in patient_data['assigned_clinicians']:
+                    patient_data['assigned_clinicians'].append(clinician_username)
+                    self._bump_assignments_version(hospital_id)
+                    # Assignments also decide which patients a clinician can see.
+                    self._bump_data_version(hospital_id)
+                    self._save_data()
+                    return True
         return False
 
     def unassign_clinician_from_patient(self, hospital_id: str, patient_username: str, clinician_username: str) -> bool:
@@ -645,34 +1209,50 @@ class CareLogService:
             bool: True if successful, False otherwise.
         """
         patient_key = f"{patient_username}_patient"
-        patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_key)
-        if patient_data and 'assigned_clinicians' in patient_data:
-            if clinician_username in patient_data['assigned_clinicians']:
-                patient_data['assigned_clinicians'].remove(clinician_username)
-                self._save_data()
-                return True
+        with self._hospital_locks[hospital_id]:
+            patient_data = self._data['hospitals'].get(hospital_id, {}).get('users', {}).get(patient_key)
+            if patient_data and 'assigned_clinicians' in patient_data:
+                if clinician_username in patient_data['assigned_clinicians']:
+                    patient_data['assigned_clinicians'].remove(clinician_username)
+                    self._bump_assignments_version(hospital_id)
+                    # Assignments also decide which patients a clinician can see.
+                    self._bump_data_version(hospital_id)
+                    self._save_data()
+                    return True
         return False
 
-    def search_notes(self, hospital_id: str, patient_id: str, search_term: str) -> list:
+    def search_notes(self, hospital_id: str, patient_id: str, search_term: str, viewer: tuple | None = None) -> list:
         """Searches a patient's notes for a given term.
 
         Args:
             hospital_id (str): The ID of the hospital.
             patient_id (str): The ID of the patient.
             search_term (str): The term to search for.
+            viewer (tuple, optional): The (username, role) whose access rules
+                apply; passed through to `get_notes_for_patient`.
 
         Returns:
             list: A list of matching note dictionaries.
         """
-        all_notes = self.get_notes_for_patient(hospital_id, patient_id)
+        all_notes = self.get_notes_for_patient(hospital_id, patient_id, viewer)
         if not search_term:
             return all_notes
-        
+
         search_term = search_term.lower()
-        
+
+        # Lowercasing every note body on every search repeats the same work
+        # across queries, so the folded text is cached per note and dropped
+        # with the other lookup tables when a note changes.
+        folded = self._search_indexes.get(hospital_id)
+        if folded is None:
+            folded = {
+                note.get('note_id'): (note.get('notes', '').lower(), note.get('diagnoses', '').lower())
+                for note in self._data['hospitals'].get(hospital_id, {}).get('notes', [])
+            }
+            self._search_indexes[hospital_id] = folded
+
         def note_matches(note):
-            notes_text = note.get('notes', '').lower()
-            diagnoses_text = note.get('diagnoses', '').lower()
+            notes_text, diagnoses_text = folded.get(note.get('note_id'), ('', ''))
             return search_term in notes_text or search_term in diagnoses_text
 
         return [note for note in all_notes if note_matches(note)]
@@ -699,7 +1279,31 @@ class CareLogService:
         Returns:
             bool: True if successful, False otherwise.
         """
-        alerts = self._data['hospitals'].get(hospital_id, {}).get('alerts', [])
-        self._data['hospitals'][hospital_id]['alerts'] = [a for a in alerts if a.get('alert_id') != alert_id]
-        self._save_data()
-        return True
\ No newline at end of file
+        with self._hospital_locks[hospital_id]:
+            alerts = self._data['hospitals'].get(hospital_id, {}).get('alerts', [])
+            self._data['hospitals'][hospital_id]['alerts'] = [a for a in alerts if a.get('alert_id') != alert_id]
+            self._save_data()
+        return True
+
+    def dismiss_alerts(self, hospital_id: str, alert_ids: list) -> int:
+        """Dismisses several pain alerts with a single save.
+
+        Args:
+            hospital_id (str): The ID of the hospital.
+            alert_ids (list): The IDs of the alerts to dismiss.
+
+        Returns:
+            int: The number of alerts actually dismissed.
+        """
+        hospital = self._data['hospitals'].get(hospital_id)
+        if not hospital:
+            return 0
+        ids = set(alert_ids)
+        with self._hospital_locks[hospital_id]:
+            alerts = hospital.get('alerts', [])
+            remaining = [a for a in alerts if a.get('alert_id') not in ids]
+            dismissed = len(alerts) - len(remaining)
+            if dismissed:
+                hospital['alerts'] = remaining
+                self._save_data()
+        return dismissed
\ No newline at end of file
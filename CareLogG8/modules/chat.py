@@ -13,11 +13,30 @@ The `ChatService` is tightly integrated with the main `CareLogService` to access
 
 from __future__ import annotations
 
-from datetime import datetime
-import uuid
+import itertools
+import secrets
+import time
 from typing import Dict, List, Optional
 
 
+def _utc_now_iso() -> str:
+    """Returns the current UTC time as a second-resolution ISO string.
+
+    Message timestamps only carry seconds, so the formatted string is cached
+    and reused until the clock ticks; bursts of messages within one second
+    skip the formatting entirely. This also avoids building datetime objects
+    just to serialize them.
+    """
+    global _last_stamp
+    second = int(time.time())
+    if second != _last_stamp[0]:
+        _last_stamp = (second, time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(second)))
+    return _last_stamp[1]
+
+
+_last_stamp = (0, "")
+
+
 class ChatService:
     """Manages patient-clinician conversations, including general and direct channels."""
 
@@ -28,39 +47,154 @@ class ChatService:
             carelog_service: An instance of the main CareLogService.
         """
         self._service = carelog_service
+        # Memoized list_* results keyed on the hospital's chat version, so
+        # polling sidebars between writes skip re-walking every thread.
+        self._listing_cache: Dict[tuple, tuple] = {}
+        # Cached chats dict per hospital and thread list per conversation.
+        # The setdefault chains in _ensure_* hash the same keys and allocate
+        # throwaway defaults on every message; these caches cut that to one
+        # dict probe. Entries are dropped when a thread object is replaced
+        # (user deletion) - in-place mutations keep them valid.
+        self._store_cache: Dict[str, Dict] = {}
+        self._thread_cache: Dict[tuple, List] = {}
+        # Reverse index per hospital: clinician -> {patient: last_ts}. Built
+        # lazily from the direct store, then kept current by appends, so
+        # listing a clinician's threads reads one inner dict instead of
+        # scanning every patient's thread map. Structural changes (clears,
+        # user deletion) drop the hospital's index for a lazy rebuild.
+        self._clin_index: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # Counts thread truncations (clears, deleted-user scrubs) per
+        # hospital. Delta readers that only ever append need this to notice
+        # that messages were *removed* and drop their accumulated copies;
+        # the chat version alone cannot distinguish removal from a write to
+        # some other thread.
+        self._trunc_epochs: Dict[str, int] = {}
+        # Message IDs combine one random node token with a counter: unique
+        # across service instances like uuid4, but without a urandom read
+        # and UUID object per message.
+        self._node = secrets.token_hex(8)
+        self._msg_counter = itertools.count()
+
+    def flush(self) -> None:
+        """Blocks until queued chat writes have reached disk.
+
+        Message saves go through the service's background writer, which
+        coalesces bursts into one encrypt-and-write cycle; callers that need
+        the messages durable right now (shutdown, tests) wait here.
+        """
+        self._service.flush()
 
     def _ensure_chat_store(self, hospital_id: str) -> Dict[str, Dict]:
         """Ensures the base chat structure exists for a hospital and returns it."""
-        hospitals = self._service._data.setdefault('hospitals', {})
-        hospital = hospitals.setdefault(
-            hospital_id,
-            {
-                "users": {},
-                "notes": [],
-                "alerts": [],
-                "chats": {
-                    "general": {},
-                    "direct": {}
+        chats = self._store_cache.get(hospital_id)
+        if chats is not None:
+            return chats
+        # Hospital creation and data load both write the full skeleton
+        # (register_user / _ensure_hospital_defaults), so on a cache miss the
+        # chats dict is normally just there to read. The setdefault fallback
+        # only runs for hospitals injected without it (tests, mainly).
+        try:
+            chats = self._service._data['hospitals'][hospital_id]['chats']
+        except KeyError:
+            hospitals = self._service._data.setdefault('hospitals', {})
+            hospital = hospitals.setdefault(
+                hospital_id,
+                {
+                    "users": {},
+                    "notes": [],
+                    "alerts": [],
+                    "chats": {
+                        "general": {},
+                        "direct": {}
+                    }
                 }
-            }
-        )
-        chats = hospital.setdefault('chats', {})
+            )
+            chats = hospital.setdefault('chats', {})
         chats.setdefault('general', {})
         chats.setdefault('direct', {})
+        self._store_cache[hospital_id] = chats
         return chats
 
     def _ensure_general_thread(self, hospital_id: str, patient_username: str) -> List[Dict]:
         """Ensures a general chat thread exists for a patient and returns it."""
-        chats = self._ensure_chat_store(hospital_id)
-        general = chats.setdefault('general', {})
-        return general.setdefault(patient_username, [])
+        key = ('general', hospital_id, patient_username)
+        thread = self._thread_cache.get(key)
+        if thread is None:
+            chats = self._ensure_chat_store(hospital_id)
+            thread = chats['general'].setdefault(patient_username, [])
+            self._thread_cache[key] = thread
+        return thread
 
     def _ensure_direct_thread(self, hospital_id: str, patient_username: str, clinician_username: str) -> List[Dict]:
         """Ensures a direct chat thread exists between a patient and a clinician and returns it."""
-        chats = self._ensure_chat_store(hospital_id)
-        direct = chats.setdefault('direct', {})
-        patient_threads = direct.setdefault(patient_username, {})
-        return patient_threads.setdefault(clinician_username, [])
+        key = ('direct', hospital_id, patient_username, clinician_username)
+        thread = self._thread_cache.get(key)
+        if thread is None:
+            chats = self._ensure_chat_store(hospital_id)
+            patient_threads = chats['direct'].setdefault(patient_username, {})
+            thread = patient_threads.setdefault(clinician_username, [])
+            self._thread_cache[key] = thread
+        return thread
+
+    def _direct_index(self, hospital_id: str) -> Dict[str, Dict[str, str]]:
+        """Returns the clinician -> {patient: last_ts} index for a hospital.
+
+        Built once by walking the direct store; afterwards appends keep it
+        current incrementally, so it only rebuilds after a clear or deletion
+        drops it.
+        """
+        index = self._clin_index.get(hospital_id)
+        if index is None:
+            index = {}
+            chats = self._ensure_chat_store(hospital_id)
+            for patient_username, clinician_threads in chats.get('direct', {}).items():
+                for clinician_username, messages in clinician_threads.items():
+                    last_ts = messages[-1].get("timestamp", "") if messages else ""
+                    index.setdefault(clinician_username, {})[patient_username] = last_ts
+            self._clin_index[hospital_id] = index
+        return index
+
+    def truncation_epoch(self, hospital_id: str) -> int:
+        """Returns how many times threads in a hospital have been truncated.
+
+        Incremented by clears and deleted-user scrubs. Readers that
+        accumulate messages incrementally compare this against the epoch
+        they last saw and refetch the full thread when it moves, since a
+        since-based delta can never surface removed messages.
+
+        Args:
+            hospital_id: The ID of the hospital.
+
+        Returns:
+            The current truncation counter, starting at 0.
+        """
+        return self._trunc_epochs.get(hospital_id, 0)
+
+    def _bump_truncation_epoch(self, hospital_id: str) -> None:
+        """Records that messages were removed from some thread in a hospital."""
+        self._trunc_epochs[hospital_id] = self._trunc_epochs.get(hospital_id, 0) + 1
+
+    def _drop_cached_threads(self, hospital_id: str, username: str) -> None:
+        """Drops cached thread references involving a removed user.
+
+        Called by the service when user deletion replaces or removes thread
+        objects; the caches are otherwise kept valid by mutating threads in
+        place.
+
+        Args:
+            hospital_id: The ID of the hospital.
+            username: The removed user, matched as patient or clinician.
+        """
+        stale = [
+            key for key in self._thread_cache
+            if key[1] == hospital_id and username in key[2:]
+        ]
+        for key in stale:
+            del self._thread_cache[key]
+        self._clin_index.pop(hospital_id, None)
+        # User deletion scrubs the user's messages out of surviving threads,
+        # so readers holding accumulated copies must refetch.
+        self._bump_truncation_epoch(hospital_id)
 
     def add_general_message(
         self,
@@ -96,6 +230,7 @@ class ChatService:
         )
         thread.append(entry)
         self._service._save_data()
+        self._service._bump_chat_version(hospital_id)
         return entry
 
     def clear_general_messages(self, hospital_id: str, patient_username: str) -> bool:
@@ -111,8 +246,11 @@ class ChatService:
         chats = self._ensure_chat_store(hospital_id)
         general = chats.setdefault('general', {})
         if patient_username in general:
-            general[patient_username] = []
+            # Clear in place so cached references to the thread stay valid.
+            general[patient_username].clear()
+            self._bump_truncation_epoch(hospital_id)
             self._service._save_data()
+            self._service._bump_chat_version(hospital_id)
             return True
         return False
 
@@ -120,7 +258,8 @@ class ChatService:
         self,
         hospital_id: str,
         patient_username: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        since: Optional[str] = None
     ) -> List[Dict]:
         """Retrieves the ordered message history for a patient's general channel.
 
@@ -128,15 +267,23 @@ class ChatService:
             hospital_id: The ID of the hospital.
             patient_username: The username of the patient.
             limit: An optional integer to limit the number of recent messages returned.
+            since: An optional ISO timestamp; only messages stamped at or after
+                it are returned, letting callers fetch just the delta. Because
+                timestamps have second resolution the boundary is inclusive, so
+                callers should de-duplicate by message_id.
 
         Returns:
             A sorted list of message dictionaries.
         """
-        thread = list(self._ensure_general_thread(hospital_id, patient_username))
-        thread.sort(key=lambda item: item.get("timestamp", ""))
+        # Messages are appended in timestamp order, so the former per-read
+        # copy-and-Timsort was pure overhead; slice and filter directly.
+        thread = self._ensure_general_thread(hospital_id, patient_username)
+        if since is not None:
+            thread = [item for item in thread if item.get("timestamp", "") >= since]
+            return thread[-limit:] if limit is not None else thread
         if limit is not None:
             return thread[-limit:]
-        return thread
+        return list(thread)
 
     def add_direct_message(
         self,
@@ -180,7 +327,11 @@ class ChatService:
             clinician_username=clinician_username
         )
         thread.append(entry)
+        index = self._clin_index.get(hospital_id)
+        if index is not None:
+            index.setdefault(clinician_username, {})[patient_username] = entry["timestamp"]
         self._service._save_data()
+        self._service._bump_chat_version(hospital_id)
         return entry
 
     def get_direct_messages(
@@ -188,7 +339,8 @@ class ChatService:
         hospital_id: str,
         patient_username: str,
         clinician_username: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        since: Optional[str] = None
     ) -> List[Dict]:
         """Retrieves the ordered message history between a patient and a clinician.
 
@@ -197,15 +349,23 @@ class ChatService:
             patient_username: The username of the patient.
             clinician_username: The username of the clinician.
             limit: An optional integer to limit the number of recent messages returned.
+            since: An optional ISO timestamp; only messages stamped at or after
+                it are returned, letting callers fetch just the delta. Because
+                timestamps have second resolution the boundary is inclusive, so
+                callers should de-duplicate by message_id.
 
         Returns:
             A sorted list of message dictionaries.
         """
-        thread = list(self._ensure_direct_thread(hospital_id, patient_username, clinician_username))
-        thread.sort(key=lambda item: item.get("timestamp", ""))
+        # Same as get_general_messages: threads are already in timestamp
+        # order, so no copy or sort is needed before slicing.
+        thread = self._ensure_direct_thread(hospital_id, patient_username, clinician_username)
+        if since is not None:
+            thread = [item for item in thread if item.get("timestamp", "") >= since]
+            return thread[-limit:] if limit is not None else thread
         if limit is not None:
             return thread[-limit:]
-        return thread
+        return list(thread)
 
     def clear_direct_messages(self, hospital_id: str, patient_username: str, clinician_username: str) -> bool:
         """Clears all messages from a direct message thread.
@@ -222,8 +382,13 @@ class ChatService:
         direct = chats.setdefault('direct', {})
         patient_threads = direct.setdefault(patient_username, {})
         if clinician_username in patient_threads:
-            patient_threads[clinician_username] = []
+            # Clear in place so cached references to the thread stay valid.
+            patient_threads[clinician_username].clear()
+            # The cleared thread's last_ts is stale; rebuild lazily.
+            self._clin_index.pop(hospital_id, None)
+            self._bump_truncation_epoch(hospital_id)
             self._service._save_data()
+            self._service._bump_chat_version(hospital_id)
             return True
         return False
 
@@ -236,6 +401,10 @@ class ChatService:
         Returns:
             A list of patient usernames.
         """
+        version = self._service.chat_version(hospital_id)
+        cached = self._listing_cache.get((hospital_id, 'general'))
+        if cached and cached[0] == version:
+            return list(cached[1])
         chats = self._ensure_chat_store(hospital_id)
         general = chats.get('general', {})
         patients = []
@@ -243,7 +412,9 @@ class ChatService:
             last_ts = messages[-1].get("timestamp") if messages else ""
             patients.append((patient_username, last_ts))
         patients.sort(key=lambda item: item[1] or "", reverse=True)
-        return [username for username, _ in patients]
+        result = [username for username, _ in patients]
+        self._listing_cache[(hospital_id, 'general')] = (version, result)
+        return list(result)
 
     def list_direct_threads_for_clinician(self, hospital_id: str, clinician_username: str) -> List[str]:
         """Lists patient usernames with direct chat history for a clinician, sorted by most recent activity.
@@ -255,16 +426,16 @@ class ChatService:
         Returns:
             A list of patient usernames.
         """
-        chats = self._ensure_chat_store(hospital_id)
-        direct = chats.get('direct', {})
-        patients = []
-        for patient_username, clinician_threads in direct.items():
-            if clinician_username in clinician_threads:
-                messages = clinician_threads[clinician_username]
-                last_ts = messages[-1].get("timestamp") if messages else ""
-                patients.append((patient_username, last_ts))
-        patients.sort(key=lambda item: item[1] or "", reverse=True)
-        return [username for username, _ in patients]
+        version = self._service.chat_version(hospital_id)
+        cached = self._listing_cache.get((hospital_id, 'direct', clinician_username))
+        if cached and cached[0] == version:
+            return list(cached[1])
+        # The reverse index narrows the rebuild to this clinician's own
+        # threads rather than a scan over every patient's thread map.
+        threads = self._direct_index(hospital_id).get(clinician_username, {})
+        result = sorted(threads, key=lambda patient: threads[patient] or "", reverse=True)
+        self._listing_cache[(hospital_id, 'direct', clinician_username)] = (version, result)
+        return list(result)
 
     def _build_message(self, sender_username: str, sender_role: str, text: str, **extra: Dict) -> Dict:
         """Constructs a standardized chat message dictionary.
@@ -278,10 +449,9 @@ class ChatService:
         Returns:
             A dictionary representing the structured chat message.
         """
-        timestamp = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
         message = {
-            "message_id": str(uuid.uuid4()),
-            "timestamp": timestamp,
+            "message_id": f"{self._node}-{next(self._msg_counter):x}",
+            "timestamp": _utc_now_iso(),
             "sender": sender_username,
             "sender_role": sender_role,
             "text": text
@@ -15,11 +15,16 @@ committed to version control. It is recommended to add `secret.key` to the `.git
 
 from cryptography.fernet import Fernet
 
-def write_key():
-    """Generates a new Fernet key and saves it to the 'secret.key' file."""
+def write_key() -> bytes:
+    """Generates a new Fernet key, saves it to 'secret.key', and returns it.
+
+    Returns:
+        bytes: The freshly generated encryption key.
+    """
     key = Fernet.generate_key()
     with open("secret.key", "wb") as key_file:
         key_file.write(key)
+    return key
 
 def load_key() -> bytes:
     """Loads the Fernet key from the 'secret.key' file.
@@ -27,7 +32,8 @@ def load_key() -> bytes:
     Returns:
         bytes: The encryption key.
     """
-    return open("secret.key", "rb").read()
+    with open("secret.key", "rb") as key_file:
+        return key_file.read()
 
 # On first run, generate and save a key if it doesn't exist.
 # This ensures the application is ready to use immediately after setup.
@@ -35,8 +41,8 @@ try:
     key = load_key()
 except FileNotFoundError:
     print("Encryption key not found. Generating a new one...")
-    write_key()
-    key = load_key()
+    # write_key returns the key it stored, so no second read is needed.
+    key = write_key()
     print("New encryption key 'secret.key' has been generated.")
 
 # Create a global Fernet instance to be used for all encryption/decryption.
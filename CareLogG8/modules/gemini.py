@@ -10,37 +10,54 @@ It is responsible for:
 This abstracts the AI integration, making it easy to call from other parts of the application.
 """
 
+import asyncio
+import threading
+
 import streamlit as st
-import google.generativeai as genai
 
-# Configure the Gemini API using the key stored in Streamlit secrets.
-# This is the recommended way to handle sensitive keys in a Streamlit app.
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+# The Gemini SDK is a heavy import and its configuration touches Streamlit
+# secrets, so both are deferred to the first feedback request instead of
+# being paid at app startup by every session. The module-level name is kept
+# so callers (and tests) can inject a replacement model.
+model = None
+_model_lock = threading.Lock()
 
-# Initialize the generative model. 'gemma-3-27b-it' is specified as the model to use.
-model = genai.GenerativeModel('gemma-3-27b-it')
+def _init_model():
+    """Imports the Gemini SDK and builds the configured model on first use.
 
-def generate_feedback(patient_notes: str, mood: int, pain: int, appetite: int) -> str | None:
-    """Generates AI-powered feedback for a patient based on their daily entry.
+    Returns:
+        The initialized generative model instance.
+    """
+    import google.generativeai as genai
 
-    This function constructs a detailed prompt that includes the patient's self-reported
-    metrics and narrative notes. It then sends this prompt to the Gemini model and
-    returns the generated text.
+    # Configure the Gemini API using the key stored in Streamlit secrets.
+    # This is the recommended way to handle sensitive keys in a Streamlit app.
+    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
 
-    Args:
-        patient_notes: The narrative notes provided by the patient.
-        mood: The patient's self-reported mood score (0-10).
-        pain: The patient's self-reported pain score (0-10).
-        appetite: The patient's self-reported appetite score (0-10).
+    # 'gemma-3-27b-it' is specified as the model to use.
+    return genai.GenerativeModel('gemma-3-27b-it')
 
-    Returns:
-        The generated feedback as a string, or None if an error occurs.
+def _get_model():
+    """Returns the shared model, initializing it once in a thread-safe way.
+
+    Streamlit runs each session on its own thread, so two first-time
+    feedback requests can race the lazy init. Double-checked locking keeps
+    the common path lock-free while ensuring only one thread pays the SDK
+    import and configuration cost.
     """
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                model = _init_model()
+    return model
 
-    # The prompt is carefully engineered to guide the AI to provide empathetic,
-    # encouraging, and safe feedback suitable for a healthcare context.
-    prompt = f"""
-    You are an AI in a hospital that gives feedback to patients based on their notes. 
+# The prompt text is carefully engineered to guide the AI to provide
+# empathetic, encouraging, and safe feedback suitable for a healthcare
+# context. It is built once as a module constant so each call only fills in
+# the per-entry fields instead of reassembling the full string.
+_PROMPT_TEMPLATE = """
+    You are an AI in a hospital that gives feedback to patients based on their notes.
     The patient reported the following:
     - Mood: {mood}/10
     - Pain: {pain}/10
@@ -49,16 +66,88 @@ def generate_feedback(patient_notes: str, mood: int, pain: int, appetite: int) -
     Patient Notes:
     {patient_notes}
 
-    Provide useful feedbacks and things that the patients can do to make themselves feel better. Be kind and encouraging. 
-    Do not assume things. Provide one paragraph of around 200 words. Only print the paragraph and nothing else. 
+    Provide useful feedbacks and things that the patients can do to make themselves feel better. Be kind and encouraging.
+    Do not assume things. Provide one paragraph of around 200 words. Only print the paragraph and nothing else.
 
 
     Feedback:
     """
 
+def _build_prompt(patient_notes: str, mood: int, pain: int, appetite: int) -> str:
+    """Fills the shared prompt template for one patient entry.
+
+    Args:
+        patient_notes: The narrative notes provided by the patient.
+        mood: The patient's self-reported mood score (0-10).
+        pain: The patient's self-reported pain score (0-10).
+        appetite: The patient's self-reported appetite score (0-10).
+
+    Returns:
+        The assembled prompt string.
+    """
+    return _PROMPT_TEMPLATE.format(
+        patient_notes=patient_notes, mood=mood, pain=pain, appetite=appetite
+    )
+
+async def generate_feedback_batch(items: list[tuple[str, int, int, int]]) -> list[str | None]:
+    """Generates feedback for several patient entries concurrently.
+
+    Each synchronous call serializes on a full model round trip, so
+    generating feedback for many notes pays the network latency per note.
+    This variant issues all requests at once and gathers the responses, so
+    a batch costs roughly one round trip.
+
+    Args:
+        items: A list of (patient_notes, mood, pain, appetite) tuples.
+
+    Returns:
+        The generated feedback strings in input order, with None for any
+        entry that failed.
+    """
+    try:
+        batch_model = _get_model()
+    except Exception as e:
+        print(f"Error initializing Gemini model: {e}")
+        return [None] * len(items)
+
+    async def _generate_one(prompt):
+        try:
+            if hasattr(batch_model, 'generate_content_async'):
+                response = await batch_model.generate_content_async(prompt)
+            else:
+                # Fall back to overlapping sync calls in threads for model
+                # substitutes without an async API.
+                response = await asyncio.to_thread(batch_model.generate_content, prompt)
+            return response.text
+        except Exception as e:
+            print(f"Error generating feedback from Gemini API: {e}")
+            return None
+
+    prompts = [_build_prompt(*item) for item in items]
+    return list(await asyncio.gather(*(_generate_one(prompt) for prompt in prompts)))
+
+def generate_feedback(patient_notes: str, mood: int, pain: int, appetite: int) -> str | None:
+    """Generates AI-powered feedback for a patient based on their daily entry.
+
+    This function constructs a detailed prompt that includes the patient's self-reported
+    metrics and narrative notes. It then sends this prompt to the Gemini model and
+    returns the generated text.
+
+    Args:
+        patient_notes: The narrative notes provided by the patient.
+        mood: The patient's self-reported mood score (0-10).
+        pain: The patient's self-reported pain score (0-10).
+        appetite: The patient's self-reported appetite score (0-10).
+
+    Returns:
+        The generated feedback as a string, or None if an error occurs.
+    """
+
+    prompt = _build_prompt(patient_notes, mood, pain, appetite)
+
     try:
         # Call the Gemini API to generate content based on the prompt.
-        response = model.generate_content(prompt)
+        response = _get_model().generate_content(prompt)
         return response.text
     except Exception as e:
         # In a production environment, this error should be logged more robustly.
@@ -7,14 +7,19 @@ representation of the core entities within the system.
 """
 # carelog/modules/models.py
 
+from dataclasses import dataclass
 from datetime import datetime
 import uuid
 
+# Both models use slots: they carry a fixed set of fields, and slotted
+# instances skip the per-object __dict__, making them smaller and their
+# attribute access faster.
+
+@dataclass(slots=True)
 class User:
     """Represents a user in the system, who can be a patient, clinician, or admin.
 
     Attributes:
-        user_id (str): A unique identifier for the user (defaults to username).
         username (str): The user's login name.
         password_hash (str): The hashed version of the user's password.
         role (str): The user's role (e.g., 'patient', 'clinician', 'admin').
@@ -23,49 +28,55 @@ class User:
         sex (str): The user's sex.
         pronouns (str): The user's preferred pronouns.
         bio (str): A short biography for the user.
+        user_id (str): A unique identifier for the user (defaults to username).
     """
-    def __init__(self, username, password_hash, role, full_name, dob, sex, pronouns, bio, user_id=None):
-        self.user_id = user_id or username
-        self.username = username
-        self.password_hash = password_hash
-        self.role = role
-        self.full_name = full_name
-        self.dob = dob
-        self.sex = sex
-        self.pronouns = pronouns
-        self.bio = bio
+    username: str
+    password_hash: str
+    role: str
+    full_name: str
+    dob: str
+    sex: str
+    pronouns: str
+    bio: str
+    user_id: str | None = None
+
+    def __post_init__(self):
+        self.user_id = self.user_id or self.username
 
+@dataclass(slots=True)
 class PatientNote:
     """Represents a single clinical note or patient entry.
 
     Attributes:
-        note_id (str): A unique identifier for the note.
-        hospital_id (str): The ID of the hospital this note belongs to.
         patient_id (str): The ID of the patient this note is about.
         author_id (str): The ID of the user who created the note.
-        timestamp (str): The ISO-formatted timestamp of when the note was created.
         mood (int): A self-reported mood score (0-10).
         pain (int): A self-reported pain score (0-10).
         appetite (int): A self-reported appetite score (0-10).
         notes (str): Narrative text, either from the patient or clinician.
         diagnoses (str): Formal medical diagnoses, typically entered by a clinician.
         source (str): The source of the entry ('patient' or 'clinician').
+        hospital_id (str): The ID of the hospital this note belongs to.
         is_private (bool): If True, the note is visible only to the patient.
         hidden_from_patient (bool): If True, the note is visible only to clinicians.
+        note_id (str): A unique identifier for the note (generated if omitted).
+        timestamp (str): The ISO-formatted creation time (generated if omitted).
     """
-    def __init__(self, patient_id, author_id, mood, pain, appetite, notes, diagnoses, source, hospital_id, is_private=False, hidden_from_patient=False, note_id=None, timestamp=None):
-        # A unique ID is generated if one is not provided.
-        self.note_id = note_id or str(uuid.uuid4())
-        self.hospital_id = hospital_id
-        self.patient_id = patient_id
-        self.author_id = author_id
-        # A timestamp is generated if one is not provided.
-        self.timestamp = timestamp or datetime.now().isoformat()
-        self.mood = mood
-        self.pain = pain
-        self.appetite = appetite
-        self.notes = notes
-        self.diagnoses = diagnoses
-        self.source = source
-        self.is_private = is_private
-        self.hidden_from_patient = hidden_from_patient
\ No newline at end of file
+    patient_id: str
+    author_id: str
+    mood: int
+    pain: int
+    appetite: int
+    notes: str
+    diagnoses: str
+    source: str
+    hospital_id: str
+    is_private: bool = False
+    hidden_from_patient: bool = False
+    note_id: str | None = None
+    timestamp: str | None = None
+
+    def __post_init__(self):
+        # A unique ID and timestamp are generated if not provided.
+        self.note_id = self.note_id or str(uuid.uuid4())
+        self.timestamp = self.timestamp or datetime.now().isoformat()
\ No newline at end of file
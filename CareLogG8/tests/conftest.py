@@ -123,11 +123,17 @@ _ensure_streamlit_secret()
 from modules import auth as auth_module  # noqa: E402
 
 
+# One key and Fernet instance for the whole suite: key generation and Fernet
+# construction per test add up under parametrization, and test isolation
+# comes from each fixture's own temp records.json, not from distinct keys.
+_TEST_FERNET = Fernet(Fernet.generate_key())
+
+
 class DummyEncryptor:
     """Simple symmetric encryptor for isolating tests from the production key."""
 
     def __init__(self):
-        self._fernet = Fernet(Fernet.generate_key())
+        self._fernet = _TEST_FERNET
 
     def encrypt(self, data: bytes) -> bytes:
         return self._fernet.encrypt(data)
@@ -152,7 +158,10 @@ def service(tmp_path, monkeypatch, dummy_encryptor):
     svc = auth_module.CareLogService()
     # Start with a clean data dictionary to ensure test isolation.
     svc._data = {"hospitals": {}}
-    return svc
+    yield svc
+    # Drain the background writer while DATA_FILE still points into the
+    # test's temp directory, so no stray write lands outside it.
+    svc.flush()
 
 
 @pytest.fixture
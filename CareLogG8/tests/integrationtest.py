@@ -112,6 +112,7 @@ def test_data_persistence_across_service_instances(service):
         "chats": {"general": {}, "direct": {}},
     }
     service._save_data()
+    service.flush()  # Saves run on the writer thread; wait for the disk write.
 
     new_service = auth_module.CareLogService()
     assert hospital_id in new_service.get_all_hospitals()
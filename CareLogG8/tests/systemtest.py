@@ -103,6 +103,7 @@ def test_system_persistence_with_multiple_services(service):
         "chats": {"general": {"user": []}, "direct": {"user": {}}},
     }
     service._save_data()
+    service.flush()  # Saves run on the writer thread; wait for the disk write.
 
     reloaded = auth_module.CareLogService()
     assert hospital_id in reloaded.get_all_hospitals()
@@ -253,6 +253,26 @@ def test_login_missing_salt_returns_error(hospital_service):
     assert result == "error"
 
 
+def test_login_upgrades_legacy_sha256_hash(hospital_service):
+    """
+    Tests the transparent upgrade of legacy salted-SHA256 password records.
+
+    A successful login against an old-style record should re-hash the
+    password with Argon2id, drop the salt field, and keep working on
+    subsequent logins.
+    """
+    service, hospital_id = hospital_service
+    record = _make_user_record("legacy", "patient")
+    service._data["hospitals"][hospital_id]["users"]["legacy_patient"] = record
+    user = service.login("legacy", STRONG_PASSWORD, "patient", hospital_id)
+    assert user is not None and user.username == "legacy"
+    assert record["password_hash"].startswith("$argon2")
+    assert "salt" not in record
+    # The upgraded record verifies via Argon2 from now on.
+    assert service.login("legacy", STRONG_PASSWORD, "patient", hospital_id) is not None
+    assert service.login("legacy", "Wrong1!pw", "patient", hospital_id) is None
+
+
 def test_load_and_save_round_trip(service):
     """
     Tests that data saved by one service instance can be loaded correctly by another.
@@ -267,12 +287,27 @@ def test_load_and_save_round_trip(service):
         "chats": {"general": {}, "direct": {}},
     }
     service._save_data()
+    service.flush()  # Saves run on the writer thread; wait for the disk write.
 
     new_service = auth_module.CareLogService()
     assert hospital_id in new_service._data["hospitals"]
     assert "user_patient" in new_service._data["hospitals"][hospital_id]["users"]
 
 
+def test_load_legacy_single_token_file(service, dummy_encryptor):
+    """
+    Tests that a data file in the old single-token format still loads.
+
+    Files written before chunked encryption hold one Fernet token with no
+    magic prefix; `_load_data` must fall back to decrypting them whole.
+    """
+    legacy_payload = dummy_encryptor.encrypt(b'{"hospitals": {"LEGACY": {}}}')
+    Path(auth_module.DATA_FILE).write_bytes(legacy_payload)
+
+    new_service = auth_module.CareLogService()
+    assert "LEGACY" in new_service._data["hospitals"]
+
+
 def test_load_invalid_data_starts_fresh(monkeypatch, tmp_path, dummy_encryptor):
     """
     Tests that if the data file is corrupted or invalid, the service initializes with a fresh, empty state.
@@ -453,6 +488,16 @@ def test_get_notes_for_patient_respects_role(hospital_service):
     hidden = service.get_notes_for_patient(hospital_id, "patient1")
     assert hidden == []
 
+    # An explicit viewer overrides the ambient current_user: callers that
+    # cache per viewer must not inherit whoever logged in last on the
+    # shared service instance.
+    viewer_notes = service.get_notes_for_patient(hospital_id, "patient1", viewer=("patient1", "patient"))
+    assert {n["note_id"] for n in viewer_notes} == {"n1", "n2"}
+    assert service.get_all_patients(hospital_id, viewer=("clin2", "clinician")) == []
+    assert [
+        p["username"] for p in service.get_all_patients(hospital_id, viewer=("clin1", "clinician"))
+    ] == ["patient1"]
+
 
 def test_get_pending_feedback_filters_by_role(hospital_service):
     """
@@ -549,6 +594,26 @@ def test_get_all_patients_respects_assignments(hospital_service):
     assert [p["username"] for p in assigned] == ["p1"]
 
 
+def test_get_users_by_usernames_batches_lookups(hospital_service):
+    """
+    Tests the batched user lookup used to prefetch chat display names.
+
+    Verifies that all requested (username, role) pairs are resolved in one call
+    and that unknown pairs are simply omitted from the result.
+    """
+    service, hospital_id = hospital_service
+    service._data["hospitals"][hospital_id]["users"] = {
+        "p1_patient": _make_user_record("p1", "patient"),
+        "c1_clinician": _make_user_record("c1", "clinician"),
+    }
+    resolved = service.get_users_by_usernames(
+        hospital_id, [("p1", "patient"), ("c1", "clinician"), ("ghost", "patient")]
+    )
+    assert set(resolved) == {("p1", "patient"), ("c1", "clinician")}
+    assert resolved[("p1", "patient")]["full_name"] == "P1 Name"
+    assert service.get_users_by_usernames("missing", [("p1", "patient")]) == {}
+
+
 def test_getters_return_expected_defaults(service):
     """
     Tests that various getter methods return sensible empty defaults when called with non-existent IDs.
@@ -583,7 +648,8 @@ def test_update_user_profile_updates_password(hospital_service):
     """
     Tests that the `update_user_profile` method can correctly update a user's details, including their password.
 
-    When a password is changed, the salt should also be regenerated.
+    When a password is changed, the record is re-hashed with Argon2id and any
+    legacy salt field is removed.
     """
     service, hospital_id = hospital_service
     record = _make_user_record("user", "patient")
@@ -596,7 +662,8 @@ def test_update_user_profile_updates_password(hospital_service):
     assert service.update_user_profile(hospital_id, "user", "patient", updated) is True
     assert record["full_name"] == "New Name"
     assert record["bio"] == "Updated bio"
-    assert record["salt"].startswith("salt_") is False  # changed salt should differ
+    assert record["password_hash"].startswith("$argon2")
+    assert "salt" not in record
     assert service.update_user_profile(hospital_id, "missing", "patient", {}) is False
 
 
@@ -726,6 +793,91 @@ def test_delete_user_handles_missing_hospital(service):
     assert service.delete_user("missing", "user", "patient") is False
 
 
+def test_bulk_user_actions_persist_once(hospital_service):
+    """
+    Tests the batch approve and delete helpers used by the admin panel.
+
+    Verifies that only matching pending users are approved, that deletes
+    skip the current user, and that each batch bumps the data version once
+    rather than once per record.
+    """
+    service, hospital_id = hospital_service
+    users = service._data["hospitals"][hospital_id]["users"]
+    users["a_patient"] = _make_user_record("a", "patient", status="pending")
+    users["b_clinician"] = _make_user_record("b", "clinician", status="pending")
+    users["c_patient"] = _make_user_record("c", "patient")
+    service.current_user = User("admin", "hash", "admin", "", "", "", "", "")
+
+    assert service.approve_users_bulk(
+        [("a", "patient"), ("b", "clinician"), ("c", "patient"), ("missing", "patient")],
+        hospital_id
+    ) == 2
+    assert users["a_patient"]["status"] == "approved"
+    assert users["b_clinician"]["status"] == "approved"
+    assert service.data_version(hospital_id) == 1
+
+    assert service.delete_users_bulk([("a", "patient"), ("b", "clinician")], hospital_id) == 2
+    assert "a_patient" not in users
+    assert "b_clinician" not in users
+    assert service.data_version(hospital_id) == 2
+
+    # A batch that deletes nothing leaves the version untouched.
+    assert service.delete_users_bulk([("missing", "patient")], hospital_id) == 0
+    assert service.data_version(hospital_id) == 2
+
+
+def test_transaction_coalesces_saves(service):
+    """
+    Tests that `transaction()` defers intermediate saves to a single write.
+
+    Inside the block, `_save_data` should only mark the store dirty; the
+    encrypted file is written once when the block exits, and `flush` on a
+    clean store is a no-op.
+    """
+    hospital_id = "HOSP"
+    with service.transaction():
+        service._data["hospitals"][hospital_id] = {
+            "users": {"user_patient": _make_user_record("user", "patient")},
+            "notes": [],
+            "alerts": [],
+            "chats": {"general": {}, "direct": {}},
+        }
+        service._save_data()
+        service._save_data()
+        assert service._dirty is True
+        assert not Path(auth_module.DATA_FILE).exists()
+    assert service._dirty is False
+    assert Path(auth_module.DATA_FILE).exists()
+
+    new_service = auth_module.CareLogService()
+    assert hospital_id in new_service._data["hospitals"]
+
+
+def test_transaction_is_per_thread(service):
+    """
+    Tests that one thread's transaction does not disable other threads' saves.
+
+    The service is shared across sessions, so while one thread is inside a
+    `transaction()` block, `flush()` from another thread must still be a
+    real durability barrier rather than a silent no-op.
+    """
+    import threading
+
+    with service.transaction():
+        service._data["hospitals"]["HOSP"] = {
+            "users": {},
+            "notes": [],
+            "alerts": [],
+            "chats": {"general": {}, "direct": {}},
+        }
+        service._save_data()
+
+        flusher = threading.Thread(target=service.flush)
+        flusher.start()
+        flusher.join()
+        assert Path(auth_module.DATA_FILE).exists()
+
+
 def test_get_all_clinicians_returns_only_approved(hospital_service):
     """
     Tests that `get_all_clinicians` only returns users with an 'approved' status.
@@ -761,6 +913,75 @@ def test_assign_and_unassign_clinician(hospital_service):
     assert service.unassign_clinician_from_patient(hospital_id, "patient", "clin") is False
 
 
+def test_assignments_version_increments_on_changes(hospital_service):
+    """
+    Tests the per-hospital assignment version counter.
+
+    Verifies that the counter starts at zero and increments on successful
+    assign/unassign operations but not on no-op attempts.
+    """
+    service, hospital_id = hospital_service
+    service._data["hospitals"][hospital_id]["users"]["patient_patient"] = _make_user_record(
+        "patient", "patient", assigned_clinicians=[]
+    )
+    assert service.assignments_version(hospital_id) == 0
+    service.assign_clinician_to_patient(hospital_id, "patient", "clin")
+    assert service.assignments_version(hospital_id) == 1
+    service.assign_clinician_to_patient(hospital_id, "patient", "clin")  # duplicate, no-op
+    assert service.assignments_version(hospital_id) == 1
+    service.unassign_clinician_from_patient(hospital_id, "patient", "clin")
+    assert service.assignments_version(hospital_id) == 2
+
+
+def test_data_version_increments_on_changes(hospital_service):
+    """
+    Tests the per-hospital data version counter.
+
+    Verifies that the counter starts at zero and increments on note and user
+    mutations but not on failed attempts.
+    """
+    service, hospital_id = hospital_service
+    service._data["hospitals"][hospital_id]["users"]["pending_clinician"] = _make_user_record(
+        "pending", "clinician", status="pending"
+    )
+    assert service.data_version(hospital_id) == 0
+    service.approve_user("pending", "clinician", hospital_id)
+    assert service.data_version(hospital_id) == 1
+    note = PatientNote(
+        patient_id="p1", author_id="pending", mood=5, pain=5, appetite=5,
+        notes="Stable", diagnoses="", source="clinician", hospital_id=hospital_id
+    )
+    service.add_note(note, hospital_id)
+    assert service.data_version(hospital_id) == 2
+    service.delete_note(note.note_id, hospital_id)
+    assert service.data_version(hospital_id) == 3
+    assert not service.approve_user("missing", "patient", hospital_id)
+    assert service.data_version(hospital_id) == 3
+
+
+def test_chat_version_increments_on_messages(hospital_service):
+    """
+    Tests the per-hospital chat version counter.
+
+    Verifies that the counter starts at zero and increments on message sends
+    and clears but not on rejected or no-op operations.
+    """
+    service, hospital_id = hospital_service
+    assert service.chat_version(hospital_id) == 0
+    service.chat.add_general_message(hospital_id, "p1", "p1", "patient", "Hello")
+    assert service.chat_version(hospital_id) == 1
+    service.chat.add_direct_message(hospital_id, "p1", "c1", "p1", "patient", "Hi doctor")
+    assert service.chat_version(hospital_id) == 2
+    # Empty messages are rejected and must not advance the counter.
+    assert service.chat.add_general_message(hospital_id, "p1", "p1", "patient", "   ") is None
+    assert service.chat_version(hospital_id) == 2
+    service.chat.clear_general_messages(hospital_id, "p1")
+    assert service.chat_version(hospital_id) == 3
+    # Clearing a thread that does not exist is a no-op.
+    assert not service.chat.clear_direct_messages(hospital_id, "p1", "nobody")
+    assert service.chat_version(hospital_id) == 3
+
+
 def test_search_notes_filters_by_term(hospital_service):
     """
     Tests the note search functionality.
@@ -796,6 +1017,26 @@ def test_alert_management(hospital_service):
     assert remaining_ids == ["a2"]
 
 
+def test_dismiss_alerts_batch(hospital_service):
+    """
+    Tests the batched alert dismissal used by the pain-alerts form.
+
+    Verifies that only matching alerts are removed, the count reflects the
+    actual removals, and missing hospitals are handled gracefully.
+    """
+    service, hospital_id = hospital_service
+    service._data["hospitals"][hospital_id]["alerts"] = [
+        {"alert_id": "a1"},
+        {"alert_id": "a2"},
+        {"alert_id": "a3"},
+    ]
+    assert service.dismiss_alerts(hospital_id, ["a1", "a3", "missing"]) == 2
+    remaining_ids = [a["alert_id"] for a in service.get_pain_alerts(hospital_id)]
+    assert remaining_ids == ["a2"]
+    assert service.dismiss_alerts(hospital_id, ["missing"]) == 0
+    assert service.dismiss_alerts("missing", ["a2"]) == 0
+
+
 def test_chat_service_general_flows(hospital_service):
     """
     Tests the core functionality of the general (care team) chat channel.
@@ -824,6 +1065,28 @@ def test_chat_service_general_flows(hospital_service):
     assert chat.clear_general_messages(hospital_id, "unknown") is False
 
 
+def test_chat_truncation_epoch_tracks_removals(hospital_service):
+    """
+    Tests that the truncation epoch moves only when messages are removed.
+
+    Delta readers use the epoch to detect clears and scrubs, so appends must
+    leave it alone while clears and user-deletion cache drops bump it.
+    """
+    service, hospital_id = hospital_service
+    chat = service.chat
+    assert chat.truncation_epoch(hospital_id) == 0
+
+    chat.add_general_message(hospital_id, "patient1", "patient1", "patient", "Hello")
+    assert chat.truncation_epoch(hospital_id) == 0
+
+    chat.clear_general_messages(hospital_id, "patient1")
+    assert chat.truncation_epoch(hospital_id) == 1
+
+    # The deletion scrub path signals truncation via _drop_cached_threads.
+    chat._drop_cached_threads(hospital_id, "patient1")
+    assert chat.truncation_epoch(hospital_id) == 2
+
+
 def test_chat_service_direct_messages_require_assignment(hospital_service):
     """
     Tests that direct messages can only be sent between a patient and an assigned clinician.
@@ -858,6 +1121,39 @@ def test_chat_service_direct_messages_require_assignment(hospital_service):
     assert chat.get_direct_messages(hospital_id, "patient", "clin") == []
 
 
+def test_chat_get_messages_since_returns_delta(hospital_service):
+    """
+    Tests the `since` cursor on message retrieval used for delta fetching.
+
+    Verifies that only messages stamped at or after the cursor are returned
+    (the boundary is inclusive because timestamps have second resolution).
+    """
+    service, hospital_id = hospital_service
+    chat = service.chat
+    service._data["hospitals"][hospital_id]["chats"]["general"] = {
+        "patient": [
+            {"message_id": "m1", "timestamp": "2024-01-01T10:00:00Z", "text": "old"},
+            {"message_id": "m2", "timestamp": "2024-01-01T11:00:00Z", "text": "boundary"},
+            {"message_id": "m3", "timestamp": "2024-01-01T12:00:00Z", "text": "new"},
+        ]
+    }
+    delta = chat.get_general_messages(hospital_id, "patient", since="2024-01-01T11:00:00Z")
+    assert [m["message_id"] for m in delta] == ["m2", "m3"]
+
+    service._data["hospitals"][hospital_id]["chats"]["direct"] = {
+        "patient": {
+            "clin": [
+                {"message_id": "d1", "timestamp": "2024-01-01T10:00:00Z"},
+                {"message_id": "d2", "timestamp": "2024-01-01T12:00:00Z"},
+            ]
+        }
+    }
+    direct_delta = chat.get_direct_messages(
+        hospital_id, "patient", "clin", since="2024-01-01T11:00:00Z"
+    )
+    assert [m["message_id"] for m in direct_delta] == ["d2"]
+
+
 def test_chat_service_listing_methods(hospital_service):
     """
     Tests the methods for listing active chat threads.
@@ -1015,6 +1311,36 @@ def test_gemini_generate_feedback_handles_errors(monkeypatch):
     assert gemini_module.generate_feedback("Notes", 5, 5, 5) is None
 
 
+def test_gemini_generate_feedback_batch(monkeypatch):
+    """
+    Tests the batch feedback API against a mocked Gemini model.
+
+    Verifies that results come back in input order and that a failure for one
+    entry yields None without affecting the others.
+    """
+    import asyncio
+
+    class DummyModel:
+        def generate_content(self, prompt):
+            if "explode" in prompt:
+                raise RuntimeError("API error")
+
+            class Response:
+                text = f"Feedback for: {prompt.count('/10')} scores"
+
+            return Response()
+
+    monkeypatch.setattr(gemini_module, "model", DummyModel(), raising=False)
+    results = asyncio.run(gemini_module.generate_feedback_batch([
+        ("Feeling fine", 7, 2, 8),
+        ("explode", 1, 9, 2),
+        ("Slept well", 6, 3, 7),
+    ]))
+    assert len(results) == 3
+    assert results[0] is not None and results[2] is not None
+    assert results[1] is None
+
+
 def test_format_timestamp_variations():
     """
     Tests the _format_timestamp GUI helper with various input formats.
@@ -1040,6 +1366,24 @@ def test_format_timestamp_variations():
 
 
 
+def test_format_timestamps_bulk_matches_scalar():
+    """
+    Tests the vectorized bulk timestamp formatter used by the chat renderer.
+
+    Verifies that it produces the same output as the scalar `_format_timestamp`
+    helper, including for None and unparseable inputs.
+    """
+    inputs = [
+        "2024-01-02T12:34:00Z",
+        datetime(2024, 1, 2, 12, 34, 0).isoformat(),
+        None,
+        "invalid",
+    ]
+    bulk = gui_module._format_timestamps_bulk(inputs)
+    assert bulk == [gui_module._format_timestamp(value) for value in inputs]
+    assert gui_module._format_timestamps_bulk([]) == []
+
+
 def test_get_display_name_uses_cache(monkeypatch):
     """
     Tests that the `_get_display_name` GUI helper uses its cache to avoid redundant lookups.
@@ -1053,6 +1397,7 @@ def test_get_display_name_uses_cache(monkeypatch):
             calls.append((hospital_id, username, role))
             return {"full_name": "Display"}
 
+    gui_module._display_name_cached.cache_clear()
     cache = {}
     service = StubService()
     name1 = gui_module._get_display_name(service, "H", "user", "patient", cache)
@@ -1061,9 +1406,15 @@ def test_get_display_name_uses_cache(monkeypatch):
     assert name2 == "Display"
     assert len(calls) == 1
 
+    # A fresh per-render cache dict still hits the module-level memo.
+    assert gui_module._get_display_name(service, "H", "user", "patient", {}) == "Display"
+    assert len(calls) == 1
+
     class EmptyService:
         def get_user_by_username(self, hospital_id, username, role):
             return {}
 
+    # Clearing the memo (as profile updates do) forces a fresh lookup.
+    gui_module._display_name_cached.cache_clear()
     cache = {}
     assert gui_module._get_display_name(EmptyService(), "H", "user", "patient", cache) == "user"